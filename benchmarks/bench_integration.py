@@ -0,0 +1,130 @@
+"""
+Benchmarks of the Blueair integration against a local stand-in server.
+
+Run them with:
+
+    pip install -r benchmarks/requirements.txt
+    python -m pytest benchmarks
+
+BLUEAIR_BENCH_LATENCY sets the simulated round trip in seconds (0.02 by
+default), and BLUEAIR_BENCH_RESULTS names a JSON file to write the
+measurements to.
+"""
+import time
+import tracemalloc
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_PASSWORD, CONF_REGION, CONF_USERNAME
+
+from custom_components.blueair.const import ACCOUNT, DOMAIN
+
+DEVICE_COUNTS = [1, 10, 100, 500]
+REFRESH_ROUNDS = 5
+COMMANDS = 5
+
+pytestmark = pytest.mark.parametrize("fake_server", DEVICE_COUNTS, indirect=True)
+
+
+async def _setup(hass) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_USERNAME: "bench@example.com",
+            CONF_PASSWORD: "secret",
+            CONF_REGION: "us",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def _unload(hass, entry: MockConfigEntry) -> None:
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_setup(hass, fake_server, local_api, record_result):
+    """Wall time of setting up an entry, from login to added entities."""
+    start = time.perf_counter()
+    entry = await _setup(hass)
+    elapsed = time.perf_counter() - start
+
+    record_result(
+        "setup",
+        len(fake_server.devices),
+        seconds=elapsed,
+        requests=sum(fake_server.requests.values()),
+    )
+    await _unload(hass, entry)
+
+
+async def test_refresh(hass, fake_server, local_api, record_result):
+    """Throughput of refreshing every device of the account."""
+    entry = await _setup(hass)
+    account = hass.data[DOMAIN][entry.entry_id][ACCOUNT]
+    queries = fake_server.requests["initial"]
+
+    start = time.perf_counter()
+    for _ in range(REFRESH_ROUNDS):
+        # Make every device due, as after a full turn of the wheel.
+        account._unscheduled.update(account.devices)
+        await account.async_refresh()
+        assert account.last_update_success
+    elapsed = time.perf_counter() - start
+
+    record_result(
+        "refresh",
+        len(fake_server.devices),
+        devices_per_second=REFRESH_ROUNDS * len(fake_server.devices) / elapsed,
+        queries_per_round=(fake_server.requests["initial"] - queries) / REFRESH_ROUNDS,
+    )
+    await _unload(hass, entry)
+
+
+async def test_command(hass, fake_server, local_api, record_result):
+    """Latency from a command until a refresh confirms the new state."""
+    entry = await _setup(hass)
+    device = hass.data[DOMAIN][entry.entry_id]["devices"][0]
+
+    latencies = []
+    for speed in range(COMMANDS):
+        start = time.perf_counter()
+        await device.set_fan_speed(speed)
+        # fan_speed shows the commanded value right away; only the polled
+        # state tells that the device has it.
+        while device._polled.get("fanspeed") != speed:
+            await device.async_refresh()
+        latencies.append(time.perf_counter() - start)
+        assert fake_server.devices[device.id]["states"]["fanspeed"] == speed
+
+    record_result(
+        "command",
+        len(fake_server.devices),
+        mean_seconds=sum(latencies) / len(latencies),
+        max_seconds=max(latencies),
+    )
+    await _unload(hass, entry)
+
+
+async def test_memory(hass, fake_server, local_api, record_result):
+    """Memory allocated by setting up an entry, in total and per device."""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        entry = await _setup(hass)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    record_result(
+        "memory",
+        len(fake_server.devices),
+        kib=(current - baseline) / 1024,
+        peak_kib=(peak - baseline) / 1024,
+        kib_per_device=(current - baseline) / 1024 / len(fake_server.devices),
+    )
+    await _unload(hass, entry)
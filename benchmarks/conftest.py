@@ -0,0 +1,77 @@
+"""Fixtures for the Blueair benchmarks."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.blueair import blueair
+
+from .fake_server import FakeBlueairServer
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+# Simulated round trip (in seconds) of every request to the stand-in server.
+LATENCY = float(os.environ.get("BLUEAIR_BENCH_LATENCY", "0.02"))
+RESULTS_FILE = os.environ.get("BLUEAIR_BENCH_RESULTS")
+
+RESULTS: list[dict] = []
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Load the integration from custom_components, with a recorder to depend on."""
+    yield
+
+
+@pytest.fixture
+async def fake_server(request, socket_enabled):
+    """Start a stand-in server with the parametrized number of devices."""
+    server = FakeBlueairServer(request.param, LATENCY)
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+def local_api(fake_server):
+    """Point the clients created by the integration at the stand-in server."""
+
+    class LocalBlueAirAwsAsync(blueair.BlueAirAwsAsync):
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            self.gigya_url_prefix = fake_server.url
+            self.api_url_prefix = fake_server.url
+
+    # The history backfill talks to the legacy API, which is not simulated.
+    with patch("custom_components.blueair.clients.API", LocalBlueAirAwsAsync), patch(
+        "custom_components.blueair.statistics.BlueairHistoryImporter.async_import"
+    ):
+        yield
+
+
+@pytest.fixture
+def record_result():
+    """Collect a measurement for the summary."""
+
+    def record(benchmark: str, devices: int, **values) -> None:
+        RESULTS.append({"benchmark": benchmark, "devices": devices, **values})
+
+    return record
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the measurements, and write them to BLUEAIR_BENCH_RESULTS if set."""
+    if not RESULTS:
+        return
+    terminalreporter.section("blueair benchmarks")
+    for result in RESULTS:
+        values = ", ".join(
+            f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in result.items()
+            if key not in ("benchmark", "devices")
+        )
+        terminalreporter.write_line(f"{result['benchmark']:<10} {result['devices']:>4} devices: {values}")
+    if RESULTS_FILE:
+        with open(RESULTS_FILE, "w") as file:
+            json.dump(RESULTS, file, indent=2)
@@ -0,0 +1,124 @@
+"""A local stand-in for the Gigya and BlueAir AWS endpoints."""
+import asyncio
+from collections import Counter
+import json
+from typing import Any
+
+from aiohttp import web
+
+ACCESS_TOKEN_LIFETIME = 86400
+
+
+class FakeBlueairServer:
+    """
+    Serves the login and /prod/c/* endpoints for simulated purifiers.
+
+    Every response is delayed by latency seconds. Commands change the state
+    of the simulated device, so that later queries report the new values.
+    """
+
+    def __init__(self, device_count: int, latency: float = 0.0) -> None:
+        """Initialize the server."""
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self.devices: dict[str, dict[str, Any]] = {
+            f"00000000-0000-0000-0000-{index:012d}": {
+                "name": f"Purifier {index}",
+                "hw": "nb_m_1.0",
+                "pm2_5": index % 50,
+                "states": {
+                    "filterusage": 10,
+                    "brightness": 50,
+                    "fanspeed": 11,
+                    "standby": False,
+                    "nightmode": False,
+                    "childlock": False,
+                    "automode": True,
+                    "online": True,
+                },
+            }
+            for index in range(device_count)
+        }
+        self.url: str | None = None
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        """Listen on a free local port."""
+        app = web.Application()
+        app.router.add_post("/accounts.login", self._login)
+        app.router.add_post("/accounts.getJWT", self._get_jwt)
+        app.router.add_post("/prod/c/login", self._api_login)
+        app.router.add_get("/prod/c/registered-devices", self._registered_devices)
+        app.router.add_post("/prod/c/{name}/r/initial", self._initial)
+        app.router.add_post("/prod/c/{uuid}/a/{service}", self._command)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _respond(self, endpoint: str, body: Any) -> web.Response:
+        self.requests[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        # Gigya answers with text/javascript, not application/json.
+        return web.Response(text=json.dumps(body), content_type="text/javascript")
+
+    async def _login(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            "accounts.login",
+            {"sessionInfo": {"sessionToken": "session-token", "sessionSecret": "secret"}},
+        )
+
+    async def _get_jwt(self, request: web.Request) -> web.Response:
+        return await self._respond("accounts.getJWT", {"id_token": "jwt"})
+
+    async def _api_login(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            "login", {"access_token": "access-token", "expires_in": ACCESS_TOKEN_LIFETIME}
+        )
+
+    async def _registered_devices(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            "registered-devices",
+            {
+                "devices": [
+                    {"uuid": uuid, "name": device["name"]}
+                    for uuid, device in self.devices.items()
+                ]
+            },
+        )
+
+    async def _initial(self, request: web.Request) -> web.Response:
+        query = await request.json()
+        uuids = [entry["id"] for entry in query["deviceconfigquery"]]
+        return await self._respond(
+            "initial",
+            {"deviceInfo": [self._device_info(uuid) for uuid in uuids if uuid in self.devices]},
+        )
+
+    async def _command(self, request: web.Request) -> web.Response:
+        command = await request.json()
+        device = self.devices[request.match_info["uuid"]]
+        device["states"][command["n"]] = command["vb"] if "vb" in command else command["v"]
+        return await self._respond("command", {})
+
+    def _device_info(self, uuid: str) -> dict[str, Any]:
+        device = self.devices[uuid]
+        return {
+            "id": uuid,
+            "configuration": {"di": {"name": device["name"], "hw": device["hw"]}},
+            "sensordata": [{"n": "pm2_5", "v": device["pm2_5"]}],
+            "states": [
+                {"n": name, "vb": value} if isinstance(value, bool) else {"n": name, "v": value}
+                for name, value in device["states"].items()
+            ],
+        }
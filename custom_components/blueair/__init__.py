@@ -1,65 +1,166 @@
 """The blueair integration."""
 import asyncio
+from datetime import timedelta
 import logging
 
-from . import blueair
+import aiohttp
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.const import CONF_PASSWORD, CONF_REGION, CONF_USERNAME
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
 
-from .const import CLIENT, DOMAIN
+from . import blueair
+from .account import BlueairAccountCoordinator
+from .clients import async_get_client_registry
+from .const import (
+    ACCOUNT,
+    CLIENT,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DOMAIN,
+    HISTORY_IMPORT_INTERVAL,
+    HISTORY_STORAGE_KEY,
+    LEGACY_CREDENTIALS_STORAGE_KEY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
 from .device import BlueairDataUpdateCoordinator
+from .statistics import BlueairHistoryImporter
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["sensor", "fan", "light", "binary_sensor", "switch"]
 
+# Errors of an unreachable or failing cloud, after which setup is retried.
+CONNECTION_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, blueair.CircuitOpenError)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up blueair from a config entry."""
-    session = async_get_clientsession(hass)
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {}
 
+    # The client may still be logged in from the config flow or before a reload.
+    registry = async_get_client_registry(hass)
     try:
-        client = await hass.async_add_executor_job(
-            lambda: blueair.BlueAirAws(
-                username=entry.data[CONF_USERNAME],
-                password=entry.data[CONF_PASSWORD],
-                region='us'
-            )
+        client = await registry.async_acquire(
+            entry.data[CONF_USERNAME],
+            entry.data[CONF_PASSWORD],
+            entry.data.get(CONF_REGION),
         )
-        hass.data[DOMAIN][entry.entry_id][CLIENT] = client
     except KeyError as e:
-        raise Unauthorized(f"BlueAir authorizarion failed")
+        raise ConfigEntryAuthFailed("BlueAir authorization failed") from e
+    except CONNECTION_ERRORS as e:
+        raise ConfigEntryNotReady(f"BlueAir API unavailable: {e}") from e
+    if CONF_REGION not in entry.data:
+        # Entries created before region discovery; later startups skip it.
+        hass.config_entries.async_update_entry(
+            entry, data=entry.data | {CONF_REGION: client.region}
+        )
+    store = Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}")
+    stored_token = await store.async_load()
+    if not stored_token or stored_token.get("username") != entry.data[CONF_USERNAME]:
+        stored_token = {}
+    if stored_token.get("token_expiration_time", 0) > client.token_expiration_time:
+        client.restore_token(stored_token)
+    client.on_token_update = lambda token_state: store.async_delay_save(
+        lambda: token_state | {"username": entry.data[CONF_USERNAME]}
+    )
+    if client.token_expiration_time > stored_token.get("token_expiration_time", 0):
+        client.on_token_update(client.token_state)
+
+    try:
+        # Logs in only if there is no valid token or it was rejected.
+        devices = await client.get_devices()
+    except KeyError as e:
+        registry.async_release(entry.data[CONF_USERNAME])
+        raise ConfigEntryAuthFailed("BlueAir authorization failed") from e
+    except CONNECTION_ERRORS as e:
+        registry.async_release(entry.data[CONF_USERNAME])
+        raise ConfigEntryNotReady(f"BlueAir API unavailable: {e}") from e
+    except Exception:
+        registry.async_release(entry.data[CONF_USERNAME])
+        raise
+    hass.data[DOMAIN][entry.entry_id][CLIENT] = client
 
-    devices = await hass.async_add_executor_job(lambda: client.get_devices())
     hass.data[DOMAIN][entry.entry_id]["devices"] = [
         BlueairDataUpdateCoordinator(hass, client, device["uuid"], device["name"])
         for device in devices
     ]
+    for device in hass.data[DOMAIN][entry.entry_id]["devices"]:
+        entry.async_on_unload(device.async_cancel_reconcile)
     _LOGGER.debug(f"BlueAir Devices {devices}")
 
-    tasks = [
-        device.async_refresh()
-        for device in hass.data[DOMAIN][entry.entry_id]["devices"]
-    ]
-    await asyncio.gather(*tasks)
+    account = BlueairAccountCoordinator(
+        hass,
+        client,
+        hass.data[DOMAIN][entry.entry_id]["devices"],
+        min_poll_interval=entry.options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+        max_poll_interval=entry.options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+    )
+    hass.data[DOMAIN][entry.entry_id][ACCOUNT] = account
+    entry.async_on_unload(account.async_add_listener(account.async_dispatch))
+    try:
+        # The platforms depend on the device models, which are only known
+        # once the device information was fetched.
+        await account.async_config_entry_first_refresh()
+    except ConfigEntryNotReady:
+        registry.async_release(entry.data[CONF_USERNAME])
+        raise
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
+    importer = BlueairHistoryImporter(
+        hass, entry.entry_id, entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD]
+    )
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, importer.async_import, timedelta(seconds=HISTORY_IMPORT_INTERVAL)
+        )
+    )
+    entry.async_on_unload(importer.close)
+    hass.async_create_task(importer.async_import())
+
+    # Only set up the platforms some device has entities on.
+    platforms = [
+        platform
+        for platform in PLATFORMS
+        if any(
+            platform in device.model_info.platforms
+            for device in hass.data[DOMAIN][entry.entry_id]["devices"]
+        )
+    ]
+    hass.data[DOMAIN][entry.entry_id]["platforms"] = platforms
     try:
-        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        await hass.config_entries.async_forward_entry_setups(entry, platforms)
     except AttributeError:
-        hass.config_entries.async_setup_platforms(entry, PLATFORMS)
+        hass.config_entries.async_setup_platforms(entry, platforms)
 
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when the options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(
+        entry, hass.data[DOMAIN][entry.entry_id]["platforms"]
+    )
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        client = hass.data[DOMAIN].pop(entry.entry_id)[CLIENT]
+        client.on_token_update = None
+        async_get_client_registry(hass).async_release(client.username)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored credentials and history cursors of a deleted config entry."""
+    for key in (STORAGE_KEY, HISTORY_STORAGE_KEY, LEGACY_CREDENTIALS_STORAGE_KEY):
+        await Store(hass, STORAGE_VERSION, f"{key}.{entry.entry_id}").async_remove()
@@ -0,0 +1,180 @@
+"""Blueair account object."""
+import asyncio
+import math
+import time
+from datetime import timedelta
+from functools import partial
+from typing import Any
+from async_timeout import timeout
+
+
+from . import blueair
+
+API = blueair.BlueAirAwsAsync
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DOMAIN,
+    LOGGER,
+    MAX_CONCURRENT_QUERIES,
+    POLL_TICK,
+)
+from .device import BlueairDataUpdateCoordinator
+from .polling import AdaptivePollInterval, TimerWheel
+
+
+class BlueairAccountCoordinator(DataUpdateCoordinator):
+    """Refreshes all devices of an account with batched API calls."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: API,
+        devices: list[BlueairDataUpdateCoordinator],
+        min_poll_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+    ) -> None:
+        """Initialize the account."""
+        self.hass: HomeAssistant = hass
+        self.api_client: API = api_client
+        self.devices: dict[str, BlueairDataUpdateCoordinator] = {
+            device.id: device for device in devices
+        }
+        # Largest number of devices the API accepted in a single query. Starts
+        # unbounded and shrinks when the API rejects a batch.
+        self._batch_size: int | None = None
+        # Each device is only included in the refreshes once it is due.
+        self._intervals: dict[str, AdaptivePollInterval] = {
+            uuid: AdaptivePollInterval(min_poll_interval, max_poll_interval)
+            for uuid in self.devices
+        }
+        # Devices are spread evenly over their first interval, so that they
+        # keep polling at different times instead of all at once.
+        self._wheel = TimerWheel(POLL_TICK, math.ceil(max_poll_interval / POLL_TICK) + 1)
+        self._phases: dict[str, float] = {
+            uuid: (index + 1) / len(self.devices) for index, uuid in enumerate(self.devices)
+        }
+        # Devices not yet on the wheel are polled on the next refresh.
+        self._unscheduled: set[str] = set(self.devices)
+        self._polling: list[str] = []
+        self._query_slots = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+        for device in devices:
+            device.on_command = partial(self.async_boost, device.id)
+
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"{DOMAIN}-{api_client.username}",
+            update_interval=timedelta(seconds=POLL_TICK),
+        )
+
+    @callback
+    def async_boost(self, uuid: str) -> None:
+        """Poll a device at the floor interval, e.g. after a command."""
+        if uuid in self._wheel:
+            self._wheel.schedule(uuid, self._intervals[uuid].floor)
+
+    @callback
+    def async_diagnostics(self) -> dict[str, Any]:
+        """Return the polling state of the account for diagnostics."""
+        now = time.monotonic()
+        return {
+            "batch_size": self._batch_size,
+            "next_poll_in": {
+                uuid: round(due_in, 1) for uuid, due_in in self._wheel.due_in(now).items()
+            },
+        }
+
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+        """Update data for the devices that are due via library."""
+        due = self._wheel.pop_due()
+        due.extend(self._unscheduled)
+        self._unscheduled.clear()
+        self._polling = due
+        try:
+            async with timeout(10):
+                return await self._fetch([self.devices[uuid] for uuid in due])
+        except asyncio.CancelledError:
+            self._reschedule_polling()
+            raise
+        except Exception as error:
+            # Listeners are not called after repeated failures, so the devices
+            # must not wait for async_dispatch to be put back on the wheel.
+            self._reschedule_polling()
+            raise UpdateFailed(error) from error
+
+    def _reschedule_polling(self) -> None:
+        """Retry the devices of a failed refresh at the usual pace, not on every tick."""
+        now = time.monotonic()
+        for uuid in self._polling:
+            interval = self._intervals[uuid].interval
+            self._wheel.schedule(uuid, interval * self._phases.pop(uuid, 1), now)
+        self._polling = []
+
+    async def _fetch(
+        self, devices: list[BlueairDataUpdateCoordinator]
+    ) -> dict[str, dict[str, Any]]:
+        """Fetch the given devices, splitting into smaller batches on rejection."""
+        if not devices:
+            return {}
+
+        batch_size = self._batch_size or len(devices)
+        while True:
+            batches = [
+                devices[i : i + batch_size]
+                for i in range(0, len(devices), batch_size)
+            ]
+            try:
+                results = await asyncio.gather(
+                    *[self._fetch_batch(batch) for batch in batches]
+                )
+            except blueair.BatchRejected as error:
+                if batch_size == 1:
+                    raise
+                batch_size = max(batch_size // 2, 1)
+                LOGGER.debug(f"Batch rejected ({error}), retrying with {batch_size} devices per query")
+                continue
+
+            if batch_size < len(devices):
+                self._batch_size = batch_size
+            return {uuid: info for result in results for uuid, info in result.items()}
+
+    async def _fetch_batch(
+        self, devices: list[BlueairDataUpdateCoordinator]
+    ) -> dict[str, dict[str, Any]]:
+        async with self._query_slots:
+            infos = await self.api_client.get_infos(
+                devices[0].registered_name, [device.id for device in devices]
+            )
+        if len(infos) == len(devices) and not any("id" in info for info in infos):
+            # Without ids, the answers come in query order.
+            return {device.id: info for device, info in zip(devices, infos)}
+        return {info["id"]: info for info in infos if "id" in info}
+
+    @callback
+    def async_dispatch(self) -> None:
+        """Fan the last account refresh out to the device coordinators."""
+        if not self.last_update_success:
+            # The failed devices were already put back on the wheel.
+            for device in self.devices.values():
+                device.async_set_update_error(self.last_exception)
+            return
+
+        now = time.monotonic()
+        for uuid in self._polling:
+            interval = self._intervals[uuid].interval
+            if uuid in self.data:
+                device = self.devices[uuid]
+                device.async_set_info(self.data[uuid])
+                interval = self._intervals[uuid].update(device)
+            else:
+                # The API left this device out of its answer.
+                self.devices[uuid].async_set_update_error(
+                    UpdateFailed(f"No information returned for {uuid}")
+                )
+            self._wheel.schedule(uuid, interval * self._phases.pop(uuid, 1), now)
+        self._polling = []
@@ -3,6 +3,7 @@ from __future__ import annotations
 from .const import DOMAIN
 from .device import BlueairDataUpdateCoordinator
 from .entity import BlueairEntity
+from .models import CHILD_LOCK, FILTER, ONLINE
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -16,25 +17,22 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     ]["devices"]
     entities = []
     for device in devices:
-        # Don't add sensors to classic models
-        if (
-                device.model.startswith("classic") and not device.model.endswith("i")
-        ) or device.model == "foobot":
-            pass
-        else:
-            entities.extend(
-                [
-                    BlueairFilterExpiredSensor(f"{device.device_name} Filter Expired", device),
-                    BlueairChildLockSensor(f"{device.device_name} Child Lock", device),
-                    BlueairOnlineSensor(f"{device.device_name} Online", device),
-                ]
+        if device.model_info.supports(FILTER):
+            entities.append(
+                BlueairFilterExpiredSensor(f"{device.device_name} Filter Expired", device)
             )
+        if device.model_info.supports(CHILD_LOCK):
+            entities.append(BlueairChildLockSensor(f"{device.device_name} Child Lock", device))
+        if device.model_info.supports(ONLINE):
+            entities.append(BlueairOnlineSensor(f"{device.device_name} Online", device))
     async_add_entities(entities)
 
 
 class BlueairFilterExpiredSensor(BlueairEntity, BinarySensorEntity):
     """Monitors the status of the Filter"""
 
+    _device_keys = ("filterusage",)
+
     def __init__(self, name: str, device: BlueairDataUpdateCoordinator):
         """Initialize the filter_status sensor."""
         super().__init__("filter_expired", name, device)
@@ -52,6 +50,7 @@ class BlueairFilterExpiredSensor(BlueairEntity, BinarySensorEntity):
 
 
 class BlueairChildLockSensor(BlueairEntity, BinarySensorEntity):
+    _device_keys = ("childlock",)
 
     def __init__(self, name, device):
         super().__init__("child_lock", name, device)
@@ -65,6 +64,8 @@ class BlueairChildLockSensor(BlueairEntity, BinarySensorEntity):
 
 
 class BlueairOnlineSensor(BlueairEntity, BinarySensorEntity):
+    _device_keys = ("online",)
+
     def __init__(self, name, device):
         """Initialize the online sensor."""
         super().__init__("online", name, device)
@@ -2,6 +2,15 @@
 
 from .blueair import BlueAir
 from .blueair_aws import BlueAirAws
+from .blueair_aws_async import BatchRejected, BlueAirAwsAsync
+from .budget import ConcurrencyBudget
+from .cache import ResponseCache
+from .circuit import CircuitBreaker, CircuitOpenError
+from .credentials import CredentialCache, FileCredentialCache
+from .measurements import MeasurementRow, MeasurementTable
+from .metrics import ApiMetrics
+from .ratelimit import AsyncRateLimiter, RateLimiter
+from .session import PooledSession
 
 __version__ = "1.0.0"
 
@@ -2,10 +2,12 @@
 
 
 import logging
+import threading
 from typing import Any, Dict, List
-import requests
 import time
 
+from .session import PooledSession
+
 logger = logging.getLogger(__name__)
 
 BLUEAIR_AWS_APIKEYS = {
@@ -29,11 +31,13 @@ class BlueAirAws(object):
         self,
         username: str,
         password: str,
-        region: str
+        region: str,
+        session: PooledSession | None = None,
     ) -> None:
         self.username = username
         self.password = password
         self.region = region
+        self.session = session if session is not None else PooledSession()
 
         self.gigya_region = BLUEAIR_AWS_APIKEYS[self.region]['gigyaRegion']
         self.aws_region = BLUEAIR_AWS_APIKEYS[self.region]['awsRegion']
@@ -43,13 +47,21 @@ class BlueAirAws(object):
         self.api_url_prefix = f"https://{self.api_dns_name}"
 
         self.token_expiration_time = 0
+        self._login_lock = threading.Lock()
 
         self._login()
     
 
+    def close(self) -> None:
+        """Close the pooled connections held by this client."""
+        self.session.close()
+
     def _renew_token_if_expired(self) -> None:
         if round(time.time()) > self.token_expiration_time:
-            self._login()
+            with self._login_lock:
+                # Another thread may have logged in while we were waiting.
+                if round(time.time()) > self.token_expiration_time:
+                    self._login()
 
     def _login(self) -> None:
         """Acquire session credentials to call BlueAir APIs."""
@@ -63,7 +75,7 @@ class BlueAirAws(object):
             'Content-Type': 'application/x-www-form-urlencoded',
         }
 
-        response = requests.post(
+        response = self.session.post(
             url= f"https://accounts.{self.gigya_region}.gigya.com/accounts.login",
             headers = gigya_headers,
             data = {
@@ -80,7 +92,7 @@ class BlueAirAws(object):
         session_secret = response['sessionInfo']['sessionSecret']
 
         # Get JWT Token
-        response = requests.post(
+        response = self.session.post(
             url = f"https://accounts.{self.gigya_region}.gigya.com/accounts.getJWT",
             headers = gigya_headers,
             data = {
@@ -93,7 +105,7 @@ class BlueAirAws(object):
         jwt_token = response['id_token']
         
         # Use JWT Token to get Access Token for Execute API endpoints
-        response = requests.post(
+        response = self.session.post(
             url = f"{self.api_url_prefix}/prod/c/login",
             headers = {
                 'Host': self.api_dns_name,
@@ -125,7 +137,7 @@ class BlueAirAws(object):
         """Get the list of devices registered in this account."""
         self._renew_token_if_expired()
 
-        return requests.get(
+        return self.session.get(
             url = f"{self.api_url_prefix}/prod/c/registered-devices",
             headers = self.api_header
         ).json()['devices']
@@ -135,7 +147,7 @@ class BlueAirAws(object):
         """Get the detailed information about a given device."""
         self._renew_token_if_expired()
         
-        return requests.post(
+        return self.session.post(
             url = f"{self.api_url_prefix}/prod/c/{device_name}/r/initial",
             headers= self.api_header | {'Content-Type': 'application/json'},
             json = {
@@ -172,7 +184,7 @@ class BlueAirAws(object):
         else:
             value_key = 'v'
 
-        return requests.post(
+        return self.session.post(
             url = f"{self.api_url_prefix}/prod/c/{decvice_uuid}/a/{service}",
             headers= self.api_header | {'Content-Type': 'application/json'},
             json = {
@@ -0,0 +1,513 @@
+"""This module provides the asyncio Blueair class to communicate with the Blueair API on AWS."""
+
+
+import asyncio
+from functools import partial
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import aiohttp
+import time
+
+from .blueair_aws import BLUEAIR_AWS_APIKEYS
+from .budget import ConcurrencyBudget
+from .circuit import CircuitBreaker
+from .metrics import ApiMetrics
+from .ratelimit import (
+    MAX_RETRIES,
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    RETRY_STATUSES,
+    AsyncRateLimiter,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the access token expires at which it is renewed in the
+# background.
+DEFAULT_RENEWAL_MARGIN = 300
+
+
+# Statuses with which the API refuses a multi-device query as too large.
+BATCH_REJECTED_STATUSES = frozenset({400, 413})
+
+
+class BatchRejected(Exception):
+    """The API refused a multi-device query as too large."""
+
+
+class BlueAirAwsAsync(object):
+    """
+    Asyncio variant of BlueAirAws.
+
+    All calls go through the provided aiohttp session, so the client can share
+    the connection pool of the host application instead of blocking a thread
+    per request. Unlike BlueAirAws, the constructor does not log in; call
+    login() to authenticate eagerly, otherwise the first request will. If the
+    region of the account is unknown, discover() finds it.
+
+    The access token can be saved with token_state and handed to a later
+    instance with restore_token() to skip the login calls. A rejected token
+    triggers a new login and a single retry of the request.
+
+    Only one login is ever in flight: concurrent callers that need a new token
+    wait for the same login. Once logged in, the token is renewed in the
+    background renewal_margin seconds before it expires, but not before half
+    of its remaining lifetime has passed.
+
+    All requests of the account share a rate limiter, which serves commands
+    before polls, and a circuit breaker, which fails requests immediately
+    with CircuitOpenError while the API is down. Several clients can share a
+    concurrency budget, which caps their requests and logins in flight.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        region: str,
+        session: aiohttp.ClientSession,
+        renewal_margin: int = DEFAULT_RENEWAL_MARGIN,
+        rate_limiter: AsyncRateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        metrics: ApiMetrics | None = None,
+        budget: ConcurrencyBudget | None = None,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.region = region
+        self.session = session
+        self.renewal_margin = renewal_margin
+        self.rate_limiter = rate_limiter if rate_limiter is not None else AsyncRateLimiter()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.metrics = metrics if metrics is not None else ApiMetrics()
+        self.budget = budget if budget is not None else ConcurrencyBudget()
+
+        self.gigya_region = BLUEAIR_AWS_APIKEYS[self.region]['gigyaRegion']
+        self.aws_region = BLUEAIR_AWS_APIKEYS[self.region]['awsRegion']
+        self.aws_rest_api_id = BLUEAIR_AWS_APIKEYS[self.region]['restApiId']
+        self.aws_api_key = BLUEAIR_AWS_APIKEYS[self.region]['apiKey']
+        self.api_dns_name = f"{self.aws_rest_api_id}.execute-api.{self.aws_region}.amazonaws.com"
+        self.api_url_prefix = f"https://{self.api_dns_name}"
+        self.gigya_url_prefix = f"https://accounts.{self.gigya_region}.gigya.com"
+
+        self.token_expiration_time = 0
+
+        self._login_lock = asyncio.Lock()
+        self._login_task: asyncio.Task | None = None
+        self._renewal_handle: asyncio.TimerHandle | None = None
+
+        # Called with token_state whenever a new access token is acquired.
+        self.on_token_update: Callable[[Dict[str, Any]], None] | None = None
+
+    @classmethod
+    async def discover(
+        cls,
+        username: str,
+        password: str,
+        session: aiohttp.ClientSession,
+        regions: Iterable[str] | None = None,
+        **kwargs,
+    ) -> "BlueAirAwsAsync":
+        """
+        Log in to all regions concurrently and return a logged in client for
+        the first region that accepts the account.
+
+        Raises KeyError if every region rejected the credentials, otherwise
+        the error of a region that could not be reached.
+        """
+        clients = {}
+        for region in regions or BLUEAIR_AWS_APIKEYS:
+            client = cls(username, password, region, session, **kwargs)
+            # Not through login(): the shared login is shielded from
+            # cancellation, and the losing regions must be stopped.
+            clients[asyncio.ensure_future(client._authenticate())] = client
+
+        found = None
+        error = None
+        pending = set(clients)
+        try:
+            while pending and found is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        found = found or clients[task]
+                    elif error is None or isinstance(error, KeyError):
+                        # A region that is down tells nothing about the credentials.
+                        error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+            for client in clients.values():
+                if client is not found:
+                    client.close()
+
+        if found is None:
+            raise error
+        logger.debug(f"Discovered region {found.region} for {username}")
+        return found
+
+    @property
+    def token_state(self) -> Dict[str, Any]:
+        """Return the access token and its expiration time."""
+        return {
+            'access_token': getattr(self, 'access_token', None),
+            'token_expiration_time': self.token_expiration_time,
+        }
+
+    def restore_token(self, state: Dict[str, Any]) -> bool:
+        """
+        Reuse an access token saved from token_state.
+
+        Returns False, leaving the client untouched, if the token has already
+        expired.
+        """
+        if not state.get('access_token') or round(time.time()) > state.get('token_expiration_time', 0):
+            return False
+
+        self._set_access_token(state['access_token'], state['token_expiration_time'])
+        return True
+
+    async def login(self) -> None:
+        """Authenticate against Gigya and the BlueAir API."""
+        await self._login()
+
+    def close(self) -> None:
+        """Stop the background token renewal."""
+        if self._renewal_handle is not None:
+            self._renewal_handle.cancel()
+            self._renewal_handle = None
+
+    async def _renew_token_if_expired(self) -> None:
+        if round(time.time()) > self.token_expiration_time:
+            await self._login()
+
+    async def _login(self, rejected_token: str | None = None) -> None:
+        """
+        Log in, or wait for the login that is already in flight.
+
+        If rejected_token is given and the token has changed since, another
+        caller has already logged in again and no new login is started.
+        """
+        async with self._login_lock:
+            if rejected_token is not None and rejected_token != getattr(self, 'access_token', None):
+                return
+            if self._login_task is None:
+                self._login_task = asyncio.ensure_future(self._authenticate())
+                self._login_task.add_done_callback(self._clear_login_task)
+            task = self._login_task
+
+        # Shield the shared login so a cancelled caller does not abort it for
+        # everybody else.
+        await asyncio.shield(task)
+
+    def _clear_login_task(self, task: asyncio.Task) -> None:
+        if self._login_task is task:
+            self._login_task = None
+
+    def _schedule_renewal(self) -> None:
+        """Renew the token renewal_margin seconds before it expires."""
+        self.close()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        # Short-lived tokens are renewed halfway through their lifetime, not
+        # right away, which would log in again and again.
+        lifetime = self.token_expiration_time - time.time()
+        margin = min(self.renewal_margin, lifetime / 2)
+        delay = max(lifetime - margin, 0)
+        self._renewal_handle = loop.call_later(
+            delay, lambda: asyncio.ensure_future(self._renew_in_background())
+        )
+
+    async def _renew_in_background(self) -> None:
+        self._renewal_handle = None
+        try:
+            await self._login()
+        except Exception as error:
+            # The next request will retry the login inline.
+            logger.warning(f"Background token renewal failed: {error}")
+
+    async def _send(
+        self,
+        endpoint: str,
+        request: Callable[[], Any],
+        is_error: Callable[[int], bool],
+        priority: int = PRIORITY_POLL,
+        devices: Iterable[str] = (),
+    ) -> Tuple[int, Any]:
+        """
+        Send the request made by request() and return the status and decoded body.
+
+        Every attempt waits for the account's rate limiter and a slot of the
+        concurrency budget, and is recorded in the metrics under the endpoint
+        name and the given devices. Throttled (429) and failed (5xx) responses
+        are retried with backoff, a 429 pausing the whole account. Once the
+        retries are used up, or if is_error() is true for another status,
+        aiohttp.ClientResponseError is raised.
+        """
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(priority)
+            async with self.budget.request():
+                # Requests the open circuit turns away are not API calls, so
+                # they are not measured.
+                async with self.circuit_breaker.guard() as call:
+                    with self.metrics.measure(endpoint, devices) as measurement:
+                        async with request() as response:
+                            status = response.status
+                            measurement.error = status >= 400
+                            if status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                                if status >= 500:
+                                    call.fail()
+                                retry_after = response.headers.get('Retry-After')
+                            else:
+                                if is_error(status):
+                                    response.raise_for_status()
+                                body = await response.read()
+                                measurement.size = len(body)
+                                # Gigya answers with text/javascript, so skip the content type check.
+                                return status, json.loads(body) if body else None
+
+            logger.debug(f"{endpoint} failed with status {status}")
+            await asyncio.sleep(self.rate_limiter.back_off(status, attempt, retry_after))
+            attempt += 1
+
+    async def _post_json(self, endpoint: str, url: str, **kwargs) -> Any:
+        """
+        Post a login step and return the decoded body.
+
+        Throttled (429) and failed (5xx) responses are retried with backoff
+        like other API calls, and raise aiohttp.ClientResponseError once the
+        retries are used up, so that an outage is not mistaken for rejected
+        credentials.
+        """
+        _, body = await self._send(
+            endpoint,
+            partial(self.session.post, url, **kwargs),
+            lambda status: status in RETRY_STATUSES,
+            # Logins block every other request, so they go first.
+            PRIORITY_COMMAND,
+        )
+        return body
+
+    async def _authenticate(self) -> None:
+        """Acquire session credentials to call BlueAir APIs."""
+        # Logins of all clients sharing the budget queue up here.
+        async with self.budget.login():
+            await self._request_token()
+
+    async def _request_token(self) -> None:
+        """Log in to Gigya and exchange its JWT for a BlueAir access token."""
+        gigya_headers = {
+            'Host': f'accounts.{self.gigya_region}.gigya.com',
+            'User-Agent': 'Blueair/58 CFNetwork/1327.0.4 Darwin/21.2.0',
+            'Connection': 'keep-alive',
+            'Accept': '*/*',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Cache-Control': 'no-cache',
+            'Content-Type': 'application/x-www-form-urlencoded',
+        }
+
+        response = await self._post_json(
+            'accounts.login',
+            f"{self.gigya_url_prefix}/accounts.login",
+            headers = gigya_headers,
+            data = {
+                'apikey': self.aws_api_key,
+                'loginID': self.username,
+                'password': self.password,
+                'targetEnv': 'mobile',
+            }
+        )
+
+        logger.debug(f"Login response: {response}")
+
+        session_token = response['sessionInfo']['sessionToken']
+        session_secret = response['sessionInfo']['sessionSecret']
+
+        # Get JWT Token
+        response = await self._post_json(
+            'accounts.getJWT',
+            f"{self.gigya_url_prefix}/accounts.getJWT",
+            headers = gigya_headers,
+            data = {
+                'oauth_token': session_token,
+                'secret': session_secret,
+                'targetEnv': 'mobile',
+            }
+        )
+
+        jwt_token = response['id_token']
+
+        # Use JWT Token to get Access Token for Execute API endpoints
+        response = await self._post_json(
+            'login',
+            f"{self.api_url_prefix}/prod/c/login",
+            headers = {
+                'Host': self.api_dns_name,
+                'Connection': 'keep-alive',
+                'idtoken': jwt_token,
+                'Accept': '*/*',
+                'User-Agent': 'Blueair/58 CFNetwork/1327.0.4 Darwin/21.2.0',
+                'Authorization': 'Bearer ' + jwt_token,
+                'Accept-Language': 'en-US,en;q=0.9',
+            },
+        )
+
+        logger.debug(f"AWS Login response: {response}")
+
+        self._set_access_token(
+            response['access_token'],
+            round(time.time()) + int(response['expires_in']),
+        )
+
+        if self.on_token_update is not None:
+            self.on_token_update(self.token_state)
+
+    def _set_access_token(self, access_token: str, expiration_time: int) -> None:
+        self.access_token = access_token
+        self.token_expiration_time = expiration_time
+        self._schedule_renewal()
+
+        self.api_header = {
+            'Host': self.api_dns_name,
+            'Connection': 'keep-alive',
+            'idtoken': self.access_token,
+            'Accept': '*/*',
+            'User-Agent': 'Blueair/58 CFNetwork/1327.0.4 Darwin/21.2.0',
+            'Authorization': 'Bearer ' + self.access_token,
+            'Accept-Language': 'en-US,en;q=0.9',
+        }
+
+    async def _api_call(
+        self,
+        method: str,
+        endpoint: str,
+        path: str,
+        payload: Any = None,
+        priority: int = PRIORITY_POLL,
+        devices: Iterable[str] = (),
+    ) -> Any:
+        """
+        Call a BlueAir API endpoint and return the decoded body.
+
+        The request is sent with _send(). If the access token is rejected,
+        log in again and retry once. Other error statuses raise
+        aiohttp.ClientResponseError.
+        """
+        await self._renew_token_if_expired()
+
+        reauthenticated = False
+        while True:
+            access_token = self.access_token
+            headers = self.api_header
+            if payload is not None:
+                headers = headers | {'Content-Type': 'application/json'}
+
+            status, body = await self._send(
+                endpoint,
+                partial(
+                    self.session.request,
+                    method,
+                    f"{self.api_url_prefix}/prod/c/{path}",
+                    headers = headers,
+                    json = payload,
+                ),
+                # A rejected token is only replaced once.
+                lambda status: status >= 400 and (reauthenticated or status not in (401, 403)),
+                priority,
+                devices,
+            )
+            if status not in (401, 403):
+                return body
+
+            logger.debug(f"Access token rejected with status {status}, logging in again")
+            reauthenticated = True
+            await self._login(rejected_token=access_token)
+
+    async def get_devices(self) -> List[Dict[str, Any]]:
+        """Get the list of devices registered in this account."""
+        response = await self._api_call('GET', 'registered-devices', 'registered-devices')
+        return response['devices']
+
+    async def get_info(self, device_name: str, device_uuid: str) -> Dict[str, Any]:
+        """Get the detailed information about a given device."""
+        device_info = await self.get_infos(device_name, [device_uuid])
+        if not device_info:
+            raise ValueError(f"No information returned for device {device_uuid}")
+        return device_info[0]
+
+    async def get_infos(self, device_name: str, device_uuids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get the detailed information about several devices in one call.
+
+        The device name is only used to build the request path; the devices
+        are selected by their UUIDs. Devices the API did not answer for are
+        missing from the result, so match the returned infos on their 'id'.
+        Raises BatchRejected if the API refuses the query as too large.
+        """
+        try:
+            response = await self._api_call(
+                'POST',
+                'initial',
+                f"{device_name}/r/initial",
+                devices = device_uuids,
+                payload = {
+                    'deviceconfigquery': [
+                        {
+                            'id': device_uuid,
+                            'r': {
+                                'r': [
+                                    'sensors',
+                                ],
+                            },
+                        }
+                        for device_uuid in device_uuids
+                    ],
+                    'includestates': True,
+                    'eventsubscription': {
+                        'include': [
+                            {
+                                'filter': {
+                                    'o': '= ' + device_uuid,
+                                },
+                            }
+                            for device_uuid in device_uuids
+                        ],
+                    },
+                }
+            )
+        except aiohttp.ClientResponseError as error:
+            if error.status in BATCH_REJECTED_STATUSES:
+                raise BatchRejected(
+                    f"Query for {len(device_uuids)} devices rejected with status {error.status}"
+                ) from error
+            raise
+        device_info = response.get('deviceInfo', [])
+
+        if len(device_info) != len(device_uuids):
+            logger.debug(f"Queried {len(device_uuids)} devices, got {len(device_info)}")
+        return device_info
+
+    async def send_command(self, device_uuid: str, service: str, action_value: bool | int):
+        """Send command to a given device."""
+        if type(action_value) == bool:
+            value_key = 'vb'
+        else:
+            value_key = 'v'
+
+        response = await self._api_call(
+            'POST',
+            'command',
+            f"{device_uuid}/a/{service}",
+            devices = [device_uuid],
+            payload = {
+                'n': service,
+                value_key: action_value,
+            },
+            priority = PRIORITY_COMMAND,
+        )
+        return response
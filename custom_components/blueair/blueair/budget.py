@@ -0,0 +1,61 @@
+"""This module provides a concurrency budget shared by several accounts."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+# Requests and logins that may be in flight at once across all accounts
+# sharing a budget.
+DEFAULT_MAX_REQUESTS = 8
+DEFAULT_MAX_LOGINS = 2
+
+
+class ConcurrencyBudget(object):
+    """
+    Caps the requests and logins in flight for the accounts that share it.
+
+    Logins queue separately from other requests, so accounts starting
+    together log in a few at a time while the accounts that are already
+    logged in keep polling. A login holds its slot across all of its steps.
+    """
+
+    def __init__(
+        self,
+        max_requests: int = DEFAULT_MAX_REQUESTS,
+        max_logins: int = DEFAULT_MAX_LOGINS,
+    ) -> None:
+        self.max_requests = max_requests
+        self.max_logins = max_logins
+        self.requests_in_flight = 0
+        self.logins_in_flight = 0
+        self._requests = asyncio.Semaphore(max_requests)
+        self._logins = asyncio.Semaphore(max_logins)
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[None]:
+        """Wait for a request slot and hold it while the request runs."""
+        async with self._requests:
+            self.requests_in_flight += 1
+            try:
+                yield
+            finally:
+                self.requests_in_flight -= 1
+
+    @asynccontextmanager
+    async def login(self) -> AsyncIterator[None]:
+        """Wait for a login slot and hold it while the login runs."""
+        async with self._logins:
+            self.logins_in_flight += 1
+            try:
+                yield
+            finally:
+                self.logins_in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return the limits and the requests and logins in flight."""
+        return {
+            "max_requests": self.max_requests,
+            "requests_in_flight": self.requests_in_flight,
+            "max_logins": self.max_logins,
+            "logins_in_flight": self.logins_in_flight,
+        }
@@ -0,0 +1,64 @@
+"""This module provides a small TTL cache for API responses."""
+
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+
+class ResponseCache(object):
+    """
+    A size-bounded cache of API responses keyed on the request path.
+
+    Entries expire ttl seconds after they were stored. When the cache is
+    full, the least recently used entry is evicted. The cache is safe to use
+    from several threads.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (True, value) for a fresh entry, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Drop all entries whose key starts with the prefix."""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of hits, misses and cached entries."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
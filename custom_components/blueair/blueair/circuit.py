@@ -0,0 +1,114 @@
+"""This module provides a circuit breaker that stops requests during cloud outages."""
+
+import asyncio
+from contextlib import asynccontextmanager
+import logging
+import time
+from typing import AsyncIterator
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failed requests after which the circuit opens, and the time (in
+# seconds) it stays open before a probe request is let through.
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The circuit is open, so the request was not sent."""
+
+
+class _Call(object):
+    __slots__ = ("failed",)
+
+    def __init__(self) -> None:
+        self.failed = False
+
+    def fail(self) -> None:
+        """Count the call as failed even though no exception was raised."""
+        self.failed = True
+
+
+class CircuitBreaker(object):
+    """
+    Trips after repeated failed requests to an account's API.
+
+    While open, requests fail immediately with CircuitOpenError instead of
+    waiting on an unreachable service. After reset_timeout seconds, a single
+    probe request is let through; if it succeeds the circuit closes,
+    otherwise it opens again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[_Call]:
+        """
+        Admit a request and record whether the service answered.
+
+        Connection errors, timeouts, cancellations and 5xx responses count as
+        failures; mark responses that were not raised as errors with
+        call.fail().
+        """
+        self._admit()
+        call = _Call()
+        try:
+            yield call
+        except aiohttp.ClientResponseError as error:
+            self._record(error.status < 500)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError, asyncio.CancelledError, OSError):
+            self._record(False)
+            raise
+        except BaseException:
+            self._record(True)
+            raise
+        else:
+            self._record(not call.failed)
+
+    def _admit(self) -> None:
+        if self.state == CLOSED:
+            return
+
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            logger.debug("Circuit half-open, sending a probe request")
+            self.state = HALF_OPEN
+            return
+
+        raise CircuitOpenError(
+            "BlueAir API unavailable, not sending requests until "
+            f"{self.reset_timeout}s after the last failure"
+        )
+
+    def _record(self, success: bool) -> None:
+        if success:
+            if self.state != CLOSED:
+                logger.info("BlueAir API reachable again, closing circuit")
+            self.state = CLOSED
+            self.failures = 0
+            return
+
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    f"BlueAir API failed {self.failures} times, pausing requests "
+                    f"for {self.reset_timeout}s"
+                )
+            self.state = OPEN
+            self._opened_at = time.monotonic()
@@ -0,0 +1,65 @@
+"""This module provides caches for the legacy client's home host and auth token."""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CredentialCache(object):
+    """
+    Keeps the home host and auth token of each username in memory.
+
+    Subclasses can override _persist() to store the credentials somewhere
+    that outlives the process.
+    """
+
+    def __init__(self, credentials: Optional[Dict[str, Dict[str, str]]] = None) -> None:
+        self._credentials = dict(credentials or {})
+        self._lock = threading.Lock()
+
+    def load(self, username: str) -> Optional[Dict[str, str]]:
+        """Return the cached home_host and auth_token for a username, if any."""
+        with self._lock:
+            credentials = self._credentials.get(username)
+            return dict(credentials) if credentials else None
+
+    def save(self, username: str, home_host: str, auth_token: str) -> None:
+        """Cache the home host and auth token of a username."""
+        with self._lock:
+            self._credentials[username] = {
+                "home_host": home_host,
+                "auth_token": auth_token,
+            }
+            self._persist(dict(self._credentials))
+
+    def invalidate(self, username: str) -> None:
+        """Forget the credentials of a username, e.g. after an auth failure."""
+        with self._lock:
+            if self._credentials.pop(username, None) is not None:
+                self._persist(dict(self._credentials))
+
+    def _persist(self, credentials: Dict[str, Dict[str, str]]) -> None:
+        pass
+
+
+class FileCredentialCache(CredentialCache):
+    """Keeps the credentials in a JSON file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        credentials = None
+        if os.path.exists(path):
+            try:
+                with open(path) as file:
+                    credentials = json.load(file)
+            except (OSError, ValueError) as error:
+                logger.warning(f"Ignoring unreadable credential cache {path}: {error}")
+        super().__init__(credentials)
+
+    def _persist(self, credentials: Dict[str, Dict[str, str]]) -> None:
+        with open(self.path, "w") as file:
+            json.dump(credentials, file)
@@ -0,0 +1,190 @@
+"""This module provides a columnar container for Blueair measurement history."""
+
+from array import array
+import math
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple, Union, overload
+
+# Marks a missing value in an integer column, which has no NaN.
+MISSING_INT = -(2 ** 63)
+
+
+def _is_missing(value: Union[int, float]) -> bool:
+    return value == MISSING_INT or value != value
+
+
+def _present(values: Iterable[Union[int, float]]) -> List[Union[int, float]]:
+    return [value for value in values if not _is_missing(value)]
+
+
+def _column(values: List[Any]) -> array:
+    """Store integers in an integer array, anything else as floats."""
+    if all(value is None or isinstance(value, int) for value in values):
+        return array("q", [MISSING_INT if value is None else value for value in values])
+    return array("d", [math.nan if value is None else value for value in values])
+
+
+def _as_float(column: array) -> array:
+    if column.typecode == "d":
+        return column
+    return array("d", [math.nan if value == MISSING_INT else value for value in column])
+
+
+class MeasurementRow(Mapping[str, Union[int, float]]):
+    """A read-only view of one sample in a MeasurementTable."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "MeasurementTable", index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Union[int, float, None]:
+        if key == "timestamp":
+            return self._table._timestamps[self._index]
+        value = self._table._columns[key][self._index]
+        return None if _is_missing(value) else value
+
+    def __iter__(self) -> Iterator[str]:
+        yield "timestamp"
+        yield from self._table._columns
+
+    def __len__(self) -> int:
+        return len(self._table._columns) + 1
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class MeasurementTable(Sequence[MeasurementRow]):
+    """
+    Measurement samples stored as one typed array per sensor.
+
+    The timestamps (in seconds) share a single array of integers. A sensor
+    whose values are all integers is an array of integers, with MISSING_INT
+    for missing values; any other sensor is an array of floats, with NaN for
+    missing values. Indexing returns MeasurementRow views, so the table can
+    be used wherever a list of per-sample dictionaries was expected.
+
+    A table never changes, so rows stay valid; slicing and concat() return
+    new tables.
+    """
+
+    __slots__ = ("_timestamps", "_columns")
+
+    def __init__(self, timestamps: array, columns: Dict[str, array]) -> None:
+        init = object.__setattr__
+        init(self, "_timestamps", timestamps)
+        init(self, "_columns", columns)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @classmethod
+    def from_rows(cls, keys: List[str], rows: List[List[Any]]) -> "MeasurementTable":
+        """Build a table from rows of values ordered like keys, one of which is 'timestamp'."""
+        time_index = keys.index("timestamp")
+        timestamps = array("q", [int(row[time_index]) for row in rows])
+        columns = {
+            key: _column([row[index] for row in rows])
+            for index, key in enumerate(keys)
+            if index != time_index
+        }
+        return cls(timestamps, columns)
+
+    @classmethod
+    def concat(cls, tables: Iterable["MeasurementTable"]) -> "MeasurementTable":
+        """
+        Return the samples of tables with the same sensors, one after the other.
+
+        A sensor is stored as floats if it is in any of the tables.
+        """
+        tables = list(tables)
+        if not tables:
+            return cls(array("q"), {})
+
+        timestamps = array("q")
+        for table in tables:
+            timestamps.extend(table._timestamps)
+        columns = {}
+        for key in tables[0]._columns:
+            parts = [table._columns[key] for table in tables]
+            if any(part.typecode == "d" for part in parts):
+                parts = [_as_float(part) for part in parts]
+            columns[key] = array(parts[0].typecode)
+            for part in parts:
+                columns[key].extend(part)
+        return cls(timestamps, columns)
+
+    @property
+    def timestamps(self) -> memoryview:
+        """Return the timestamps, read-only."""
+        return memoryview(self._timestamps).toreadonly()
+
+    @property
+    def columns(self) -> Mapping[str, memoryview]:
+        """Return the values of every sensor, read-only."""
+        return MappingProxyType(
+            {key: memoryview(column).toreadonly() for key, column in self._columns.items()}
+        )
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    @overload
+    def __getitem__(self, index: int) -> MeasurementRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "MeasurementTable": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return MeasurementTable(
+                self._timestamps[index],
+                {key: column[index] for key, column in self._columns.items()},
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("measurement index out of range")
+        return MeasurementRow(self, index)
+
+    def __repr__(self) -> str:
+        return f"<MeasurementTable {len(self)} samples of {list(self._columns)}>"
+
+    def column(self, key: str) -> memoryview:
+        """Return the values of one sensor (or the timestamps), read-only."""
+        if key == "timestamp":
+            return self.timestamps
+        return memoryview(self._columns[key]).toreadonly()
+
+    def mean(self, key: str) -> float | None:
+        """Return the mean of a sensor, ignoring missing values."""
+        values = _present(self._columns[key])
+        return math.fsum(values) / len(values) if values else None
+
+    def aggregate(
+        self, key: str, period: int
+    ) -> List[Tuple[int, float, Union[int, float], Union[int, float]]]:
+        """
+        Aggregate a sensor into periods of the given length (in seconds).
+
+        Returns (period start, mean, min, max) for every period that has at
+        least one value. The samples must be sorted by timestamp.
+        """
+        results = []
+        column = self._columns[key]
+        timestamps = self._timestamps
+        start = 0
+        while start < len(timestamps):
+            bucket = timestamps[start] - timestamps[start] % period
+            end = start
+            while end < len(timestamps) and timestamps[end] < bucket + period:
+                end += 1
+            values = _present(column[start:end])
+            if values:
+                results.append(
+                    (bucket, math.fsum(values) / len(values), min(values), max(values))
+                )
+            start = end
+        return results
@@ -0,0 +1,120 @@
+"""This module provides per-endpoint and per-device request statistics."""
+
+from bisect import bisect_left
+import time
+from typing import Any, Dict, Iterable, Optional
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last
+# bucket counts everything slower.
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class RequestStats(object):
+    """Counters and a latency histogram for one endpoint or device."""
+
+    __slots__ = ("calls", "errors", "bytes", "total_ms", "max_ms", "histogram")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, latency_ms: float, size: int, error: bool) -> None:
+        self.calls += 1
+        self.errors += error
+        self.bytes += size
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.histogram[bisect_left(LATENCY_BUCKETS, latency_ms)] += 1
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        return self.total_ms / self.calls if self.calls else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "mean_ms": round(self.mean_ms, 1) if self.calls else None,
+            "max_ms": round(self.max_ms, 1),
+            "histogram_ms": {
+                **{f"<={bound}": count for bound, count in zip(LATENCY_BUCKETS, self.histogram)},
+                f">{LATENCY_BUCKETS[-1]}": self.histogram[-1],
+            },
+        }
+
+
+class _Measurement(object):
+    """Times a request for ApiMetrics.measure()."""
+
+    __slots__ = ("_metrics", "_endpoint", "_devices", "_start", "size", "error")
+
+    def __init__(self, metrics: "ApiMetrics", endpoint: str, devices: Iterable[str]) -> None:
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._devices = devices
+        self.size = 0
+        self.error = False
+
+    def __enter__(self) -> "_Measurement":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self._metrics.record(
+            self._endpoint,
+            (time.perf_counter() - self._start) * 1000,
+            self.size,
+            self.error or exc_type is not None,
+            self._devices,
+        )
+
+
+class ApiMetrics(object):
+    """Collects request statistics of a client by endpoint and by device."""
+
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, RequestStats] = {}
+        self.devices: Dict[str, RequestStats] = {}
+
+    def record(
+        self,
+        endpoint: str,
+        latency_ms: float,
+        size: int = 0,
+        error: bool = False,
+        devices: Iterable[str] = (),
+    ) -> None:
+        """
+        Record one request to an endpoint, on behalf of the given devices.
+
+        The bytes of a request for several devices are split between them.
+        """
+        self.endpoints.setdefault(endpoint, RequestStats()).record(latency_ms, size, error)
+        devices = list(devices)
+        for index, device in enumerate(devices):
+            share = size * (index + 1) // len(devices) - size * index // len(devices)
+            self.devices.setdefault(device, RequestStats()).record(latency_ms, share, error)
+
+    def measure(self, endpoint: str, devices: Iterable[str] = ()) -> _Measurement:
+        """
+        Return a context manager that records the request it wraps.
+
+        Set size to the number of bytes received, and error to count a
+        response as failed without raising.
+        """
+        return _Measurement(self, endpoint, devices)
+
+    def device(self, device: str) -> RequestStats:
+        """Return the statistics of a device, empty if it was never requested."""
+        return self.devices.get(device) or RequestStats()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoints": {name: stats.as_dict() for name, stats in self.endpoints.items()},
+            "devices": {name: stats.as_dict() for name, stats in self.devices.items()},
+        }
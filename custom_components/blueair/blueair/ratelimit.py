@@ -0,0 +1,173 @@
+"""This module provides per-account request rate limiting and retry backoff."""
+
+import asyncio
+from email.utils import parsedate_to_datetime
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Requests with a lower priority value are served first.
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+
+# Sustained requests per second and burst size allowed per account.
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 10
+
+# Retries of throttled (429) or failed (5xx) requests, and the base and cap
+# (in seconds) of the exponential backoff between them.
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Return the delay before retrying a throttled or failed request.
+
+    A Retry-After header (seconds or an HTTP date) wins; otherwise the delay
+    is drawn uniformly up to an exponentially growing cap ("full jitter").
+    """
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), BACKOFF_MAX)
+        except ValueError:
+            pass
+        try:
+            delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            return min(max(delay, 0.0), BACKOFF_MAX)
+        except (TypeError, ValueError):
+            pass
+
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class _TokenBucket(object):
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        # _updated lies in the future while paused.
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def _wait_time(self) -> float:
+        """Return the time until the next token is available."""
+        return max(self._updated - time.monotonic(), 0.0) + max(1 - self._tokens, 0.0) / self.rate
+
+    def pause(self, delay: float) -> None:
+        """Hand out no tokens for the given number of seconds."""
+        self._refill()
+        self._tokens = 0.0
+        self._updated = max(self._updated, time.monotonic() + delay)
+
+    def back_off(self, status: int, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Back off after a throttled (429) or failed (5xx) response.
+
+        Returns how long the caller has to wait before retrying. Throttling
+        applies to the whole account, so a 429 pauses the bucket instead and
+        the retry only has to acquire again.
+        """
+        delay = backoff_delay(attempt, retry_after)
+        logger.debug(f"Request failed with status {status}, retrying in {delay:.1f}s")
+        if status == 429:
+            self.pause(delay)
+            return 0.0
+        return delay
+
+
+class AsyncRateLimiter(_TokenBucket):
+    """
+    An asyncio token bucket shared by all requests of an account.
+
+    Waiting requests are served by priority, then in arrival order, so user
+    commands overtake queued background polls.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        super().__init__(rate, burst)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """Wait until a request may be sent."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._wake()
+        await future
+
+    def pause(self, delay: float) -> None:
+        super().pause(delay)
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # The waiter was cancelled.
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+
+        if self._waiters:
+            self._timer = asyncio.get_running_loop().call_later(self._wait_time(), self._wake)
+
+
+class RateLimiter(_TokenBucket):
+    """
+    A thread-safe token bucket shared by all requests of an account.
+
+    Threads waiting with a lower priority value are served first.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        super().__init__(rate, burst)
+        self._condition = threading.Condition()
+        self._waiting = {PRIORITY_COMMAND: 0, PRIORITY_POLL: 0}
+
+    def acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """Block until a request may be sent."""
+        with self._condition:
+            self._waiting[priority] = self._waiting.get(priority, 0) + 1
+            try:
+                while True:
+                    self._refill()
+                    overtaken = any(
+                        count for other, count in self._waiting.items() if other < priority
+                    )
+                    if self._tokens >= 1 and not overtaken:
+                        self._tokens -= 1
+                        return
+                    self._condition.wait(self._wait_time() or 0.05)
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def pause(self, delay: float) -> None:
+        with self._condition:
+            super().pause(delay)
@@ -0,0 +1,92 @@
+"""This module provides a keep-alive requests session shared by the synchronous clients."""
+
+import logging
+import time
+from typing import Any, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Number of distinct hosts to keep pools for. The AWS client talks to the
+# Gigya accounts host and the regional API gateway, the legacy client to the
+# lookup host and the home host.
+DEFAULT_POOL_CONNECTIONS = 4
+
+# Number of sockets kept open per host.
+DEFAULT_POOL_MAXSIZE = 10
+
+# Idle time (in seconds) after which pooled sockets are dropped instead of
+# reused, since the load balancers close them on their side anyway.
+DEFAULT_IDLE_TIMEOUT = 120
+
+
+class PooledSession(requests.Session):
+    """
+    A requests session that keeps connections alive between calls.
+
+    Every client instance owns one of these, so consecutive calls to the same
+    host reuse an open TCP+TLS connection instead of performing a new
+    handshake for each request.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        super().__init__()
+        self.idle_timeout = idle_timeout
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        self._last_request_time = 0.0
+        self._request_count = 0
+        self._retired_connections = 0
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        now = time.monotonic()
+        if (
+            self._last_request_time
+            and now - self._last_request_time > self.idle_timeout
+        ):
+            logger.debug("Connection pool idle, dropping pooled connections")
+            self.reset_pool()
+
+        self._last_request_time = now
+        self._request_count += 1
+
+        return super().request(method, url, *args, **kwargs)
+
+    def _pools(self):
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    yield pool
+
+    def reset_pool(self) -> None:
+        """Close all pooled connections; the next request opens a fresh one."""
+        self._retired_connections += sum(
+            pool.num_connections for pool in self._pools()
+        )
+        for adapter in set(self.adapters.values()):
+            adapter.poolmanager.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of requests sent and connections opened and reused."""
+        opened = self._retired_connections + sum(
+            pool.num_connections for pool in self._pools()
+        )
+        return {
+            "requests": self._request_count,
+            "connections_opened": opened,
+            "connections_reused": max(self._request_count - opened, 0),
+        }
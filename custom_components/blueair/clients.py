@@ -0,0 +1,136 @@
+"""Shared Blueair API clients."""
+from functools import partial
+
+from . import blueair
+
+API = blueair.BlueAirAwsAsync
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    CLIENT_RELEASE_DELAY,
+    CLIENTS,
+    DOMAIN,
+    LOGGER,
+    MAX_CONCURRENT_LOGINS,
+    MAX_CONCURRENT_REQUESTS,
+)
+
+
+@callback
+def async_get_client_registry(hass: HomeAssistant) -> "BlueairClientRegistry":
+    """Return the client registry, creating it on first use."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if CLIENTS not in data:
+        data[CLIENTS] = BlueairClientRegistry(hass)
+    return data[CLIENTS]
+
+
+class BlueairClientRegistry:
+    """
+    Keeps one API client per username.
+
+    The config flow, the setup of an entry and its reloads all acquire the
+    client from here, so its access token outlives them and adding or
+    reloading an account does not log in again. A client is closed once all
+    its users have released it and nobody acquired it again within
+    CLIENT_RELEASE_DELAY seconds, or when Home Assistant stops.
+
+    All clients share Home Assistant's HTTP session and one concurrency
+    budget, so accounts starting together queue their logins instead of
+    flooding Gigya.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self.hass: HomeAssistant = hass
+        self._clients: dict[str, API] = {}
+        self._users: dict[str, int] = {}
+        self._cancel_close: dict[str, CALLBACK_TYPE] = {}
+        self.budget = blueair.ConcurrencyBudget(
+            max_requests=MAX_CONCURRENT_REQUESTS, max_logins=MAX_CONCURRENT_LOGINS
+        )
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_close_all)
+
+    async def async_acquire(
+        self, username: str, password: str, region: str | None = None
+    ) -> API:
+        """
+        Return the client of an account, creating it if needed.
+
+        Without a region, all regions are tried and the new client is already
+        logged in. Raises KeyError if no region accepts the credentials.
+        """
+        client = self._clients.get(username)
+        if client is not None and (
+            client.password != password or region not in (None, client.region)
+        ):
+            # The old client can no longer log in.
+            self._async_close(username)
+            client = None
+
+        if client is None:
+            session = async_get_clientsession(self.hass)
+            if region is None:
+                client = await API.discover(username, password, session, budget=self.budget)
+            else:
+                client = API(
+                    username=username,
+                    password=password,
+                    region=region,
+                    session=session,
+                    budget=self.budget,
+                )
+
+            if username in self._clients:
+                # Acquired by somebody else while discovering the region.
+                client.close()
+                client = self._clients[username]
+            else:
+                self._clients[username] = client
+                self._users[username] = 0
+        else:
+            LOGGER.debug(f"Reusing the client of {username}")
+
+        cancel = self._cancel_close.pop(username, None)
+        if cancel is not None:
+            cancel()
+        self._users[username] += 1
+        return client
+
+    @callback
+    def async_release(self, username: str) -> None:
+        """Give up a client, closing it unless it is acquired again soon."""
+        if username not in self._users:
+            return
+
+        self._users[username] -= 1
+        if self._users[username] == 0:
+            self._cancel_close[username] = async_call_later(
+                self.hass,
+                CLIENT_RELEASE_DELAY,
+                partial(self._async_close_unused, username),
+            )
+
+    @callback
+    def _async_close_unused(self, username: str, *_) -> None:
+        self._cancel_close.pop(username, None)
+        if self._users.get(username) == 0:
+            self._async_close(username)
+
+    @callback
+    def _async_close_all(self, _event: Event) -> None:
+        """Stop the token renewals and pending closes of all clients."""
+        for username in list(self._clients):
+            self._async_close(username)
+
+    @callback
+    def _async_close(self, username: str) -> None:
+        cancel = self._cancel_close.pop(username, None)
+        if cancel is not None:
+            cancel()
+        self._users.pop(username, None)
+        self._clients.pop(username).close()
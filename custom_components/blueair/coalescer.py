@@ -0,0 +1,81 @@
+"""Command coalescing for Blueair devices."""
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import COMMAND_COALESCE_DELAY
+
+
+class _PendingCommand:
+    """The latest value waiting to be sent for one attribute."""
+
+    def __init__(self, future: asyncio.Future) -> None:
+        self.future = future
+        self.value: Any = None
+        self.writer: object = None
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class CommandCoalescer:
+    """
+    Coalesces bursts of commands for the same attribute of a device.
+
+    Every call restarts a short debounce window for its attribute. When the
+    window expires, only the last value is sent, and all callers of the burst
+    wait for that single command.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        send: Callable[[str, Any], Awaitable[Any]],
+        delay: float = COMMAND_COALESCE_DELAY,
+    ) -> None:
+        """Initialize the coalescer."""
+        self.hass = hass
+        self._send = send
+        self._delay = delay
+        self._pending: dict[str, _PendingCommand] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def async_send(self, service: str, value: Any) -> bool:
+        """
+        Queue a value for the attribute and wait until the burst is sent.
+
+        Returns True if this call's value was the one sent, False if it was
+        superseded by a later call. Raises if sending the command failed.
+        """
+        pending = self._pending.get(service)
+        if pending is None:
+            pending = _PendingCommand(self.hass.loop.create_future())
+            self._pending[service] = pending
+        else:
+            pending.timer.cancel()
+
+        writer = object()
+        pending.value = value
+        pending.writer = writer
+        pending.timer = self.hass.loop.call_later(
+            self._delay, self._async_schedule_flush, service
+        )
+
+        await asyncio.shield(pending.future)
+        return pending.writer is writer
+
+    @callback
+    def _async_schedule_flush(self, service: str) -> None:
+        pending = self._pending.pop(service)
+        self.hass.async_create_task(self._async_flush(service, pending))
+
+    async def _async_flush(self, service: str, pending: _PendingCommand) -> None:
+        # Commands for the same attribute go out one at a time, so a burst
+        # that started while the previous one was in flight lands last.
+        lock = self._locks.setdefault(service, asyncio.Lock())
+        async with lock:
+            try:
+                await self._send(service, pending.value)
+            except Exception as error:
+                pending.future.set_exception(error)
+            else:
+                pending.future.set_result(None)
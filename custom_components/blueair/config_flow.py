@@ -1,15 +1,22 @@
 """Config flow for blueair integration."""
 import voluptuous as vol
-from . import blueair
-
 
 from homeassistant import config_entries, core, exceptions
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .const import DOMAIN, LOGGER
+from homeassistant.const import CONF_PASSWORD, CONF_REGION, CONF_USERNAME
+from homeassistant.core import callback
+
+from .clients import async_get_client_registry
+from .const import (
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DOMAIN,
+    LOGGER,
+)
 
 DATA_SCHEMA = vol.Schema({vol.Required("username"): str, vol.Required("password"): str})
+REAUTH_SCHEMA = vol.Schema({vol.Required("password"): str})
 
 
 async def validate_input(hass: core.HomeAssistant, data):
@@ -17,22 +24,23 @@ async def validate_input(hass: core.HomeAssistant, data):
     Data has the keys from DATA_SCHEMA with values provided by the user.
     """
 
-    session = async_get_clientsession(hass)
+    # Keep the logged in client for the setup of the new entry.
+    registry = async_get_client_registry(hass)
+    client = None
     try:
-        client = await hass.async_add_executor_job(
-            lambda: blueair.BlueAirAws(
-                username=data[CONF_USERNAME],
-                password=data[CONF_PASSWORD],
-                region='us'
-            )
-        )
-        LOGGER.debug(f"Connecting as {data[CONF_USERNAME]}")
+        # Finds the region of the account, or reuses a logged in client.
+        client = await registry.async_acquire(data[CONF_USERNAME], data[CONF_PASSWORD])
+        await client.get_devices()
+        LOGGER.debug(f"Connecting as {data[CONF_USERNAME]} in region {client.region}")
     except KeyError as e:
         raise InvalidAuth(f"BlueAir authorization failed")
     except Exception as e:
         raise CannotConnect()
+    finally:
+        if client is not None:
+            registry.async_release(data[CONF_USERNAME])
 
-    return {"title": f"BlueAir {data[CONF_USERNAME]}"}
+    return {"title": f"BlueAir {data[CONF_USERNAME]}", CONF_REGION: client.region}
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -40,6 +48,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self):
+        """Initialize the flow."""
+        self._reauth_entry = None
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         errors = {}
@@ -48,7 +60,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._abort_if_unique_id_configured()
             try:
                 info = await validate_input(self.hass, user_input)
-                return self.async_create_entry(title=info["title"], data=user_input)
+                return self.async_create_entry(
+                    title=info["title"], data=user_input | {CONF_REGION: info[CONF_REGION]}
+                )
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidAuth:
@@ -58,6 +72,79 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_reauth(self, entry_data):
+        """Handle a password the API no longer accepts."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        """Ask for the new password, then reload the entry with it."""
+        errors = {}
+        if user_input is not None:
+            data = self._reauth_entry.data | {CONF_PASSWORD: user_input[CONF_PASSWORD]}
+            try:
+                info = await validate_input(self.hass, data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            else:
+                self.hass.config_entries.async_update_entry(
+                    self._reauth_entry, data=data | {CONF_REGION: info[CONF_REGION]}
+                )
+                await self.hass.config_entries.async_reload(self._reauth_entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=REAUTH_SCHEMA,
+            description_placeholders={CONF_USERNAME: self._reauth_entry.data[CONF_USERNAME]},
+            errors=errors,
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle blueair options."""
+
+    def __init__(self, config_entry):
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the polling intervals."""
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_POLL_INTERVAL] > user_input[CONF_MAX_POLL_INTERVAL]:
+                errors["base"] = "invalid_poll_interval"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_MIN_POLL_INTERVAL,
+                        default=options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                    vol.Required(
+                        CONF_MAX_POLL_INTERVAL,
+                        default=options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                }
+            ),
+            errors=errors,
+        )
+
 
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -3,5 +3,55 @@ import logging
 
 LOGGER = logging.getLogger(__package__)
 
+ACCOUNT = "account"
 CLIENT = "client"
+CLIENTS = "clients"
 DOMAIN = "blueair"
+
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+
+# Polling interval (in seconds) for an active device, and the default floor
+# and ceiling the adaptive interval stays within.
+POLL_INTERVAL = 60
+DEFAULT_MIN_POLL_INTERVAL = 15
+DEFAULT_MAX_POLL_INTERVAL = 600
+
+# Seconds a device is polled at the floor after a command or a large PM2.5
+# change, and the PM2.5 change (in µg/m³) that counts as large.
+POLL_BOOST_DURATION = 120
+PM25_CHANGE_THRESHOLD = 10
+
+# Resolution (in seconds) of the account's poll schedule, and the number of
+# device queries that may run at once.
+POLL_TICK = 5
+MAX_CONCURRENT_QUERIES = 4
+
+# Devices in standby are polled this many times less often.
+STANDBY_POLL_FACTOR = 5
+
+# Seconds to wait for further commands to the same attribute (e.g. while a
+# slider is dragged) before sending only the last one.
+COMMAND_COALESCE_DELAY = 0.5
+
+# Seconds after a command before the device is refreshed to confirm the
+# optimistically shown state.
+RECONCILE_DELAY = 5
+
+# Seconds a released client is kept logged in, so that an entry reload or the
+# setup following the config flow can take it over.
+CLIENT_RELEASE_DELAY = 60
+
+# Requests and logins that may be in flight at once across all accounts.
+MAX_CONCURRENT_REQUESTS = 8
+MAX_CONCURRENT_LOGINS = 2
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.token"
+HISTORY_STORAGE_KEY = f"{DOMAIN}.history"
+LEGACY_CREDENTIALS_STORAGE_KEY = f"{DOMAIN}.legacy_credentials"
+
+# How far back (in seconds) history is imported for a device seen for the
+# first time, and how often new history is imported.
+HISTORY_MAX_BACKFILL = 7 * 24 * 3600
+HISTORY_IMPORT_INTERVAL = 3600
@@ -1,19 +1,25 @@
 """Blueair device object."""
 import asyncio
-from datetime import datetime, timedelta
-from typing import Any
+import time
+from datetime import datetime
+from typing import Any, Callable, Iterable
 from async_timeout import timeout
 
 
 from . import blueair
 
-API = blueair.BlueAirAws
+API = blueair.BlueAirAwsAsync
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 import homeassistant.util.dt as dt_util
 
-from .const import DOMAIN, LOGGER
+from .coalescer import CommandCoalescer
+from .const import DOMAIN, LOGGER, RECONCILE_DELAY
+from .models import BlueairModel, lookup_model
+from .state import DeviceState, parse_info
 
 
 class BlueairDataUpdateCoordinator(DataUpdateCoordinator):
@@ -28,15 +34,35 @@ class BlueairDataUpdateCoordinator(DataUpdateCoordinator):
         self._uuid: str = uuid
         self._name: str = device_name
         self._manufacturer: str = "BlueAir"
-        self._device_information: dict[str, Any] = {}
-        self._datapoint: dict[str, Any] = {}
-        self._attribute: dict[str, Any] = {}
+        # Looked up once the device information reports the hardware.
+        self.model_info: BlueairModel = lookup_model(None)
+        # The state shown, made of the values last reported by the API and
+        # the values of commands that are shown before the API confirms them.
+        self.state: DeviceState = DeviceState()
+        self._polled: dict[str, Any] = {}
+        self._optimistic: dict[str, Any] = {}
+        # Optimistic values whose commands the API has accepted, to be
+        # dropped from the overlay once the device is refreshed.
+        self._confirmed: dict[str, Any] = {}
+        self._cancel_reconcile: CALLBACK_TYPE | None = None
+        self.last_command_time: float | None = None
+        # Called after a command was sent, so that the account polls the
+        # device again soon.
+        self.on_command: Callable[[], None] | None = None
+        self._commands = CommandCoalescer(hass, self._send_command)
+        # Listeners interested in a subset of the state fields, and the state
+        # they were last notified about.
+        self._key_listeners: dict[object, tuple[frozenset[str] | None, CALLBACK_TYPE]] = {}
+        self._notified_state: DeviceState | None = None
+        self._notified_success: bool | None = None
 
         super().__init__(
             hass,
             LOGGER,
             name=f"{DOMAIN}-{device_name}",
-            update_interval=timedelta(seconds=60),
+            # Polled in batches by BlueairAccountCoordinator; refreshing this
+            # coordinator directly only happens after sending a command.
+            update_interval=None,
         )
 
     async def _async_update_data(self):
@@ -47,15 +73,56 @@ class BlueairDataUpdateCoordinator(DataUpdateCoordinator):
         except Exception as error:
             raise UpdateFailed(error) from error
 
+    @callback
+    def async_add_key_listener(
+        self, keys: Iterable[str] | None, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """
+        Listen for changes of the given state fields.
+
+        The callback also runs when the device becomes available or
+        unavailable. With keys set to None, it runs on every update.
+        """
+        token = object()
+        self._key_listeners[token] = (
+            frozenset(keys) if keys is not None else None,
+            update_callback,
+        )
+
+        @callback
+        def remove_listener() -> None:
+            self._key_listeners.pop(token, None)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the key listeners whose keys changed, then all other listeners."""
+        changed = self.state.changed_fields(self._notified_state)
+        availability_changed = self.last_update_success != self._notified_success
+        self._notified_state = self.state
+        self._notified_success = self.last_update_success
+
+        for keys, update_callback in list(self._key_listeners.values()):
+            if availability_changed or keys is None or not keys.isdisjoint(changed):
+                update_callback()
+
+        super().async_update_listeners()
+
     @property
     def id(self) -> str:
         """Return Blueair device id."""
         return self._uuid
 
+    @property
+    def registered_name(self) -> str:
+        """Return the device name as registered in the Blueair account."""
+        return self._name
+
     @property
     def device_name(self) -> str:
         """Return device name."""
-        return self._device_information.get("name", f"{self.name}")
+        return self.state.name or f"{self.name}"
 
     @property
     def manufacturer(self) -> str:
@@ -65,139 +132,154 @@ class BlueairDataUpdateCoordinator(DataUpdateCoordinator):
     @property
     def model(self) -> str:
         """Return model for device, or the UUID if it's not known."""
-        if 'hw' in self._device_information:
-            hw = self._device_information['hw']
-            match hw:
-                case "nb_m_1.0":
-                    return "Blue Pure 311i Max"
-                case _:
-                    return "BlueAir Wi-Fi Enabled Purifier"
-        else: 
+        if self.state.hw is None:
             return self.id
+        return self.model_info.name
 
     @property
     def pm25(self) -> int | None:
         """Return the current pm2.5 measurement."""
-        if "pm2_5" not in self._datapoint:
-            return None
-        return self._datapoint["pm2_5"]
-    
+        return self.state.pm2_5
+
     @property
     def filter_usage(self) -> int | None:
         """Return the filter usage."""
-        if "filterusage" not in self._attribute:
-            return None
-        return self._attribute["filterusage"]
+        return self.state.filterusage
 
     @property
     def brightness(self) -> int | None:
         """Return the current brightness."""
-        if "brightness" not in self._attribute:
-            return None
-        return int(self._attribute["brightness"])
-    
+        return self.state.brightness
+
     @property
     def fan_speed(self) -> int | None:
         """Return the current fan speed."""
-        if "fanspeed" not in self._attribute:
-            return None
-        return int(self._attribute["fanspeed"])
+        return self.state.fanspeed
 
     @property
     def is_on(self) -> bool | None:
         """Return True if the device is on."""
-        if "standby" not in self._attribute:
+        if self.state.standby is None:
             return None
-        return not self._attribute["standby"]
+        return not self.state.standby
 
     @property
     def night_mode(self) -> bool | None:
         """Return True if night mode is on."""
-        if "nightmode" not in self._attribute:
-            return None
-        return self._attribute["nightmode"]
+        return self.state.nightmode
 
     @property
     def child_lock(self) -> bool | None:
         """Return True if child lock is on."""
-        if "childlock" not in self._attribute:
-            return None
-        return self._attribute["childlock"]
+        return self.state.childlock
 
     @property
     def auto_mode(self) -> bool | None:
         """Return True if the fan is in auto mode."""
-        if "automode" not in self._attribute:
-            return None
-        return self._attribute["automode"]
+        return self.state.automode
 
     @property
     def wifi_working(self) -> bool | None:
         """Return True if device is online."""
-        if "online" not in self._attribute:
-            return None
-        return self._attribute["online"]
-    
+        return self.state.online
+
     async def set_fan_speed(self, new_speed: int) -> None:
-        await self.hass.async_add_executor_job(
-            lambda: self.api_client.send_command(self._uuid, 'fanspeed', new_speed)
-        )
-        self._attribute["fan_speed"] = new_speed
-        await self.async_refresh()
+        await self._async_set_state('fanspeed', new_speed)
 
     async def set_brightness(self, new_brightness: int) -> None:
-        await self.hass.async_add_executor_job(
-            lambda: self.api_client.send_command(self._uuid, 'brightness', new_brightness)
-        )
-        self._attribute["brightness"] = new_brightness
-        await self.async_refresh()
+        await self._async_set_state('brightness', new_brightness)
 
     async def set_auto_mode(self, new_auto_mode: bool) -> None:
-        await self.hass.async_add_executor_job(
-            lambda: self.api_client.send_command(self._uuid, 'automode', new_auto_mode)
-        )
-        self._attribute["automode"] = new_auto_mode
-        await self.async_refresh()
+        await self._async_set_state('automode', new_auto_mode)
 
     async def set_night_mode(self, new_night_mode: bool) -> None:
         """Turn on the night mode."""
-        await self.hass.async_add_executor_job(
-            lambda: self.api_client.send_command(self._uuid, 'nightmode', new_night_mode)
-        )
-        self._attribute["nightmode"] = new_night_mode
-        await self.async_refresh()
+        await self._async_set_state('nightmode', new_night_mode)
 
     async def set_child_lock(self, new_child_lock: bool) -> None:
         """Turn on the child lock."""
-        await self.hass.async_add_executor_job(
-            lambda: self.api_client.send_command(self._uuid, 'childlock', new_child_lock)
-        )
-        self._attribute["childlock"] = new_child_lock
-        await self.async_refresh()
-    
+        await self._async_set_state('childlock', new_child_lock)
+
     async def set_on(self, on: bool) -> None:
         """Turn on the device."""
-        standby = not on
-        await self.hass.async_add_executor_job(
-            lambda: self.api_client.send_command(self._uuid, 'standby', standby)
+        await self._async_set_state('standby', not on)
+
+    async def _async_set_state(self, service: str, value: bool | int) -> None:
+        """Show the new state right away, send the command and reconcile later."""
+        self.last_command_time = time.monotonic()
+        self._optimistic[service] = value
+        self.state = self.state.replace({service: value})
+        self.async_update_listeners()
+
+        try:
+            sent = await self._commands.async_send(service, value)
+        except Exception as error:
+            # Roll back unless a newer value was queued in the meantime.
+            if self._optimistic.get(service) == value:
+                del self._optimistic[service]
+            self._update_state()
+            self.async_update_listeners()
+            await self.async_request_refresh()
+            raise HomeAssistantError(
+                f"Failed to set {service} on {self.device_name}: {error}"
+            ) from error
+
+        if sent:
+            self._confirmed[service] = value
+            self._schedule_reconcile()
+            if self.on_command is not None:
+                self.on_command()
+
+    def _schedule_reconcile(self) -> None:
+        """Refresh from the API once the device has applied the command."""
+        if self._cancel_reconcile is not None:
+            self._cancel_reconcile()
+        self._cancel_reconcile = async_call_later(
+            self.hass, RECONCILE_DELAY, self._async_reconcile
         )
-        self._attribute["standby"] = standby
+
+    @callback
+    def async_cancel_reconcile(self) -> None:
+        """Drop the pending refresh after a command, when the entry is unloaded."""
+        if self._cancel_reconcile is not None:
+            self._cancel_reconcile()
+            self._cancel_reconcile = None
+
+    async def _async_reconcile(self, _now: datetime) -> None:
+        self._cancel_reconcile = None
+        # Keep the values of commands that are still queued or in flight.
+        for service, value in self._confirmed.items():
+            if self._optimistic.get(service) == value:
+                del self._optimistic[service]
+        self._confirmed.clear()
         await self.async_refresh()
 
+    async def _send_command(self, service: str, value: bool | int) -> None:
+        await self.api_client.send_command(self._uuid, service, value)
+
+    @callback
+    def async_set_info(self, info: dict[str, Any]) -> None:
+        """Apply device information fetched by the account coordinator."""
+        self._apply_info(info)
+        self.async_set_updated_data(None)
+
     async def _update_device(self, *_) -> None:
         """Update the device information from the API."""
-        LOGGER.info(f"Calling _update_device for {self._name}")
+        LOGGER.debug(f"Calling _update_device for {self._name}")
 
-        info = await self.hass.async_add_executor_job(
-            lambda: self.api_client.get_info(self._name, self._uuid)
-        )
-        LOGGER.info(f"_device_info: {info}")
+        info = await self.api_client.get_info(self._name, self._uuid)
+        LOGGER.debug(f"_device_info: {info}")
+
+        self._apply_info(info)
 
-        self._device_information = info['configuration']['di']
-        LOGGER.info(f"_device_information: {self._device_information}")
-        
-        self._datapoint = {sd['n']: int(sd['v']) for sd in info['sensordata']}
-        LOGGER.info(f"_datapoint: {self._datapoint}")
+    def _apply_info(self, info: dict[str, Any]) -> None:
+        """Store the configuration, sensor data and states of the device."""
+        self._polled = parse_info(info)
+        self._update_state()
 
-        self._attribute = {state['n']: (int(state['v']) if 'v' in state else bool(state['vb'])) for state in info['states']}
-        LOGGER.info(f"_attribute: {self._attribute}")
+    def _update_state(self) -> None:
+        hw = self.state.hw
+        self.state = self.state.evolve(self._polled | self._optimistic)
+        LOGGER.debug(f"state: {self.state}")
+        if self.state.hw != hw:
+            self.model_info = lookup_model(self.state.hw)
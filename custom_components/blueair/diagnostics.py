@@ -0,0 +1,47 @@
+"""Diagnostics support for Blueair."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import ACCOUNT, CLIENT, DOMAIN
+
+# The title ("BlueAir <username>") and unique ID of an entry are its username.
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, "title", "unique_id"}
+# Device names are chosen by the user and can identify them.
+DEVICE_TO_REDACT = {"name"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data[CLIENT]
+    account = data[ACCOUNT]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "account": account.async_diagnostics(),
+        "circuit": {
+            "state": client.circuit_breaker.state,
+            "failures": client.circuit_breaker.failures,
+        },
+        "api": client.metrics.as_dict(),
+        "budget": client.budget.stats(),
+        "devices": async_redact_data(
+            {
+                device.id: {
+                    "name": device.device_name,
+                    "model": device.model,
+                    "available": device.last_update_success,
+                    "state_version": device.state.version,
+                    "state": device.state.as_dict(),
+                }
+                for device in data["devices"]
+            },
+            DEVICE_TO_REDACT,
+        ),
+    }
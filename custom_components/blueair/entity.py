@@ -12,6 +12,8 @@ class BlueairEntity(Entity):
 
     _attr_force_update = False
     _attr_should_poll = False
+    # Datapoint and attribute keys the state depends on; None for all.
+    _device_keys: tuple[str, ...] | None = None
 
     def __init__(
         self,
@@ -43,4 +45,8 @@ class BlueairEntity(Entity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_write_ha_state))
+        self.async_on_remove(
+            self._device.async_add_key_listener(
+                self._device_keys, self.async_write_ha_state
+            )
+        )
@@ -9,6 +9,7 @@ from typing import Any, Optional
 from .const import DOMAIN
 from .device import BlueairDataUpdateCoordinator
 from .entity import BlueairEntity
+from .models import FAN_SPEED
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
@@ -18,18 +19,16 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     ]["devices"]
     entities = []
     for device in devices:
-        if device.model != 'foobot':
-            entities.extend(
-                [
-                    BlueairFan(f"{device.device_name} Fan", device),
-                ]
-            )
+        if device.model_info.supports(FAN_SPEED):
+            entities.append(BlueairFan(f"{device.device_name} Fan", device))
     async_add_entities(entities)
 
 
 class BlueairFan(BlueairEntity, FanEntity):
     """Controls Fan."""
 
+    _device_keys = ("standby", "fanspeed")
+
     def __init__(self, name: str, device: BlueairDataUpdateCoordinator):
         """Initialize the temperature sensor."""
         super().__init__("Fan", name, device)
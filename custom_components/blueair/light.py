@@ -1,6 +1,7 @@
 from .const import DOMAIN
 from .device import BlueairDataUpdateCoordinator
 from .entity import BlueairEntity
+from .models import BRIGHTNESS
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
     ColorMode,
@@ -15,21 +16,13 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     ]["devices"]
     entities = []
     for device in devices:
-        # Don't add sensors to classic models
-        if (
-                device.model.startswith("classic") and not device.model.endswith("i")
-        ) or device.model == "foobot":
-            pass
-        else:
-            entities.extend(
-                [
-                    BlueairLightEntity(f"{device.device_name} LED", device),
-                ]
-            )
+        if device.model_info.supports(BRIGHTNESS):
+            entities.append(BlueairLightEntity(f"{device.device_name} LED", device))
     async_add_entities(entities)
 
 
 class BlueairLightEntity(BlueairEntity, LightEntity):
+    _device_keys = ("brightness",)
     _attr_color_mode = ColorMode.BRIGHTNESS
     _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
 
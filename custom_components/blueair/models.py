@@ -0,0 +1,74 @@
+"""Blueair models and the features they support."""
+from typing import NamedTuple
+
+# Features a device may support; each one enables some entities.
+PM25 = "pm25"
+FILTER = "filter"
+CHILD_LOCK = "child_lock"
+NIGHT_MODE = "night_mode"
+AUTO_MODE = "auto_mode"
+POWER = "power"
+FAN_SPEED = "fan_speed"
+BRIGHTNESS = "brightness"
+ONLINE = "online"
+
+PURIFIER_FEATURES = frozenset(
+    {PM25, FILTER, CHILD_LOCK, NIGHT_MODE, AUTO_MODE, POWER, FAN_SPEED, BRIGHTNESS, ONLINE}
+)
+
+# Platforms with entities for a feature. The sensor platform is always set up
+# for the diagnostic sensors.
+FEATURE_PLATFORMS = {
+    PM25: ("sensor",),
+    FILTER: ("sensor", "binary_sensor"),
+    CHILD_LOCK: ("binary_sensor", "switch"),
+    NIGHT_MODE: ("switch",),
+    AUTO_MODE: ("switch",),
+    POWER: ("switch",),
+    FAN_SPEED: ("fan",),
+    BRIGHTNESS: ("light",),
+    ONLINE: ("binary_sensor",),
+}
+ALWAYS_PLATFORMS = ("sensor",)
+
+
+class BlueairModel(NamedTuple):
+    """A device model and the features it supports."""
+
+    name: str
+    features: frozenset[str]
+    platforms: frozenset[str]
+
+    def supports(self, feature: str) -> bool:
+        """Return whether the model supports a feature."""
+        return feature in self.features
+
+
+def _model(name: str, features: frozenset[str]) -> BlueairModel:
+    platforms = {
+        platform for feature in features for platform in FEATURE_PLATFORMS[feature]
+    }
+    return BlueairModel(name, features, frozenset(platforms).union(ALWAYS_PLATFORMS))
+
+
+# Models by hardware identifier ("hw" in the device information).
+MODELS = {
+    "nb_m_1.0": _model("Blue Pure 311i Max", PURIFIER_FEATURES),
+}
+
+# Classic purifiers without Wi-Fi ("i") only report the fan speed, and Foobot
+# air monitors are not supported.
+CLASSIC_MODEL = _model("BlueAir Classic Purifier", frozenset({FAN_SPEED}))
+FOOBOT_MODEL = _model("Foobot", frozenset())
+DEFAULT_MODEL = _model("BlueAir Wi-Fi Enabled Purifier", PURIFIER_FEATURES)
+
+
+def lookup_model(hw: str | None) -> BlueairModel:
+    """Return the model of a hardware identifier."""
+    if hw in MODELS:
+        return MODELS[hw]
+    if hw == "foobot":
+        return FOOBOT_MODEL
+    if hw is not None and hw.startswith("classic") and not hw.endswith("i"):
+        return CLASSIC_MODEL
+    return DEFAULT_MODEL
@@ -0,0 +1,139 @@
+"""Adaptive polling intervals and poll scheduling for Blueair devices."""
+import math
+import time
+
+from .const import (
+    PM25_CHANGE_THRESHOLD,
+    POLL_BOOST_DURATION,
+    POLL_INTERVAL,
+    STANDBY_POLL_FACTOR,
+)
+from .device import BlueairDataUpdateCoordinator
+from .state import DeviceState
+
+
+class AdaptivePollInterval:
+    """
+    Chooses how long to wait before polling a device again.
+
+    Offline devices are polled at the ceiling, devices in standby and devices
+    whose readings did not change are polled progressively less often, and
+    devices that were just given a command or saw a large PM2.5 change are
+    polled at the floor for a while.
+    """
+
+    def __init__(self, floor: float, ceiling: float) -> None:
+        """Initialize the interval."""
+        self.floor = floor
+        self.ceiling = ceiling
+        self.base = min(max(POLL_INTERVAL, floor), ceiling)
+        self.interval = self.base
+        self._readings: DeviceState | None = None
+        self._pm25: int | None = None
+        self._boost_until: float = 0
+
+    def update(self, device: BlueairDataUpdateCoordinator) -> float:
+        """Return the interval until the next poll, given freshly polled data."""
+        now = time.monotonic()
+        # Snapshots of the same device are equal whenever nothing changed.
+        readings = device.state
+
+        if (
+            device.last_command_time is not None
+            and now - device.last_command_time < POLL_BOOST_DURATION
+        ):
+            self._boost_until = max(
+                self._boost_until, device.last_command_time + POLL_BOOST_DURATION
+            )
+        if (
+            self._pm25 is not None
+            and device.pm25 is not None
+            and abs(device.pm25 - self._pm25) >= PM25_CHANGE_THRESHOLD
+        ):
+            self._boost_until = now + POLL_BOOST_DURATION
+
+        if device.wifi_working is False:
+            interval = self.ceiling
+        elif now < self._boost_until:
+            interval = self.floor
+        elif readings == self._readings:
+            interval = min(self.interval * 2, self.ceiling)
+        else:
+            interval = self.base
+
+        if device.is_on is False and now >= self._boost_until:
+            interval = max(interval, min(self.base * STANDBY_POLL_FACTOR, self.ceiling))
+
+        self.interval = interval
+        self._readings = readings
+        self._pm25 = device.pm25
+        return interval
+
+
+class TimerWheel:
+    """
+    Tracks when each device of an account is due for a poll.
+
+    Devices are kept in one bucket per tick of the wheel, so scheduling a
+    device and collecting the due ones takes time in proportion to the
+    devices involved rather than to all devices of the account, and a single
+    timer ticking the wheel serves any number of devices. Polls more than a
+    full turn ahead wait out the extra turns in their bucket.
+    """
+
+    def __init__(self, tick: float, slots: int, now: float | None = None) -> None:
+        """Initialize the wheel."""
+        self.tick = tick
+        self._slots: list[dict[str, int]] = [{} for _ in range(max(slots, 1))]
+        self._position = 0
+        # Time the current slot was reached.
+        self._time = time.monotonic() if now is None else now
+        self._slot_of: dict[str, int] = {}
+        self._due_at: dict[str, float] = {}
+
+    def schedule(self, key: str, delay: float, now: float | None = None) -> None:
+        """Make a device due delay seconds from now, replacing any earlier schedule."""
+        now = time.monotonic() if now is None else now
+        self.cancel(key)
+        ticks = max(math.ceil((now + delay - self._time) / self.tick), 1)
+        slot = (self._position + ticks) % len(self._slots)
+        # The slot is passed this many times before the poll is due.
+        self._slots[slot][key] = (ticks - 1) // len(self._slots)
+        self._slot_of[key] = slot
+        self._due_at[key] = now + delay
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slot_of
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def cancel(self, key: str) -> None:
+        """Forget the schedule of a device."""
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._slots[slot][key]
+            del self._due_at[key]
+
+    def pop_due(self, now: float | None = None) -> list[str]:
+        """Turn the wheel up to now and return the devices that became due."""
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._time + self.tick <= now:
+            self._time += self.tick
+            self._position = (self._position + 1) % len(self._slots)
+            bucket = self._slots[self._position]
+            for key, rounds in list(bucket.items()):
+                if rounds:
+                    bucket[key] = rounds - 1
+                else:
+                    del bucket[key]
+                    del self._slot_of[key]
+                    del self._due_at[key]
+                    due.append(key)
+        return due
+
+    def due_in(self, now: float | None = None) -> dict[str, float]:
+        """Return the seconds until each scheduled device is due."""
+        now = time.monotonic() if now is None else now
+        return {key: max(due_at - now, 0.0) for key, due_at in self._due_at.items()}
@@ -1,10 +1,12 @@
 """Support for Blueair sensors."""
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.const import DEVICE_CLASS_PM25
+from homeassistant.helpers.entity import EntityCategory
 
 from .const import DOMAIN
 from .device import BlueairDataUpdateCoordinator
 from .entity import BlueairEntity
+from .models import FILTER, PM25
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
@@ -14,23 +16,24 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     ]["devices"]
     entities = []
     for device in devices:
-        # Don't add sensors to classic models
-        if (
-            device.model.startswith("classic") and not device.model.endswith("i")
-        ) or device.model == "foobot":
-            pass
-        else:            
-            entities.extend(
-                [
-                    BlueairPM25Sensor(f"{device.device_name} PM2.5 Sensor", device),
-                    BlueairFilterUsageSensor(f"{device.device_name} Filter Usage", device),
-                ]
+        if device.model_info.supports(PM25):
+            entities.append(BlueairPM25Sensor(f"{device.device_name} PM2.5 Sensor", device))
+        if device.model_info.supports(FILTER):
+            entities.append(
+                BlueairFilterUsageSensor(f"{device.device_name} Filter Usage", device)
             )
+        entities.extend(
+            [
+                BlueairApiLatencySensor(f"{device.device_name} API Latency", device),
+                BlueairApiCallsSensor(f"{device.device_name} API Calls", device),
+            ]
+        )
     async_add_entities(entities)
 
 class BlueairPM25Sensor(BlueairEntity, SensorEntity):
     """Monitors the pm25"""
 
+    _device_keys = ("pm2_5",)
     _attr_device_class = DEVICE_CLASS_PM25
     _attr_native_unit_of_measurement = "µg/m³"
 
@@ -49,6 +52,8 @@ class BlueairPM25Sensor(BlueairEntity, SensorEntity):
 class BlueairFilterUsageSensor(BlueairEntity, SensorEntity):
     """Monitors the status of the Filter"""
 
+    _device_keys = ("filterusage",)
+
     def __init__(self, name: str, device: BlueairDataUpdateCoordinator):
         """Initialize the filter_status sensor."""
         super().__init__("filter_usage", name, device)
@@ -61,3 +66,46 @@ class BlueairFilterUsageSensor(BlueairEntity, SensorEntity):
         if self._device.filter_usage is None:
             return None
         return str(self._device.filter_usage)
+
+class BlueairApiLatencySensor(BlueairEntity, SensorEntity):
+    """Monitors the mean latency of the API calls made for a device"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = "ms"
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(self, name: str, device: BlueairDataUpdateCoordinator):
+        """Initialize the API latency sensor."""
+        super().__init__("api_latency", name, device)
+
+    @property
+    def native_value(self) -> float:
+        """Return the mean API latency."""
+        mean_ms = self._device.api_client.metrics.device(self._device.id).mean_ms
+        if mean_ms is None:
+            return None
+        return round(mean_ms, 0)
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the error count and worst latency."""
+        stats = self._device.api_client.metrics.device(self._device.id)
+        return {"errors": stats.errors, "max_ms": round(stats.max_ms, 0)}
+
+class BlueairApiCallsSensor(BlueairEntity, SensorEntity):
+    """Counts the API calls made for a device"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = "total_increasing"
+    _attr_icon = "mdi:counter"
+
+    def __init__(self, name: str, device: BlueairDataUpdateCoordinator):
+        """Initialize the API calls sensor."""
+        super().__init__("api_calls", name, device)
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of API calls since startup."""
+        return self._device.api_client.metrics.device(self._device.id).calls
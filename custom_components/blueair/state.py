@@ -0,0 +1,110 @@
+"""Immutable snapshots of the state of a Blueair device."""
+from typing import Any, Mapping
+
+# Device information, sensor data and states kept in a snapshot, named as in
+# the API.
+INFO_FIELDS = ("name", "hw")
+SENSOR_FIELDS = ("pm2_5",)
+STATE_FIELDS = (
+    "filterusage",
+    "brightness",
+    "fanspeed",
+    "standby",
+    "nightmode",
+    "childlock",
+    "automode",
+    "online",
+)
+FIELDS = INFO_FIELDS + SENSOR_FIELDS + STATE_FIELDS
+
+_SENSOR_FIELDS = frozenset(SENSOR_FIELDS)
+_STATE_FIELDS = frozenset(STATE_FIELDS)
+
+
+class DeviceState:
+    """
+    The known values of a device at one point in time.
+
+    Fields the API did not report are None. A snapshot never changes; the
+    successors returned by replace() and evolve() carry a higher version, and
+    are the snapshot itself if no value changed. Within a lineage, the same
+    version therefore means the same values, but values that changed and
+    changed back compare equal under different versions. Equality compares
+    the values.
+    """
+
+    __slots__ = ("version",) + FIELDS
+
+    def __init__(self, values: Mapping[str, Any] = {}, version: int = 0) -> None:
+        """Initialize the snapshot."""
+        init = object.__setattr__
+        init(self, "version", version)
+        for field in FIELDS:
+            init(self, field, values.get(field))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, field) for field in FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, DeviceState):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    def __repr__(self) -> str:
+        return f"DeviceState(version={self.version}, {self.as_dict()})"
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the reported values."""
+        return {
+            field: value
+            for field in FIELDS
+            if (value := getattr(self, field)) is not None
+        }
+
+    def evolve(self, values: Mapping[str, Any]) -> "DeviceState":
+        """Return the successor holding exactly the given values."""
+        if all(getattr(self, field) == values.get(field) for field in FIELDS):
+            return self
+        return DeviceState(values, self.version + 1)
+
+    def replace(self, changes: Mapping[str, Any]) -> "DeviceState":
+        """Return the successor with some values changed."""
+        if all(getattr(self, field) == value for field, value in changes.items()):
+            return self
+        return DeviceState(self.as_dict() | dict(changes), self.version + 1)
+
+    def changed_fields(self, other: "DeviceState | None") -> set[str]:
+        """Return the fields whose values differ from another snapshot."""
+        if other is self:
+            return set()
+        if other is None:
+            return {field for field in FIELDS if getattr(self, field) is not None}
+        return {
+            field
+            for field in FIELDS
+            if getattr(self, field) != getattr(other, field)
+        }
+
+
+def parse_info(info: Mapping[str, Any]) -> dict[str, Any]:
+    """Pick the known fields out of a device information."""
+    values = {}
+    di = (info.get("configuration") or {}).get("di") or {}
+    for field in INFO_FIELDS:
+        if field in di:
+            values[field] = di[field]
+    for sensor in info.get("sensordata", ()):
+        if sensor["n"] in _SENSOR_FIELDS:
+            values[sensor["n"]] = int(sensor["v"])
+    for state in info.get("states", ()):
+        if state["n"] in _STATE_FIELDS:
+            values[state["n"]] = int(state["v"]) if "v" in state else bool(state["vb"])
+    return values
@@ -0,0 +1,161 @@
+"""Backfill of Blueair measurement history into long-term statistics."""
+from functools import partial
+import time
+from typing import Any
+
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from . import blueair
+from .const import (
+    DOMAIN,
+    HISTORY_MAX_BACKFILL,
+    HISTORY_STORAGE_KEY,
+    LEGACY_CREDENTIALS_STORAGE_KEY,
+    LOGGER,
+    STORAGE_VERSION,
+)
+
+# Measurements of the legacy API and their units.
+MEASUREMENT_UNITS = {
+    "pm1": "µg/m³",
+    "pm25": "µg/m³",
+    "pm10": "µg/m³",
+    "temperature": "°C",
+    "humidity": "%",
+    "co2": "ppm",
+    "voc": "ppb",
+}
+
+
+class _StoreCredentialCache(blueair.CredentialCache):
+    """Persists the legacy client's credentials in Home Assistant storage."""
+
+    def __init__(self, hass: HomeAssistant, store: Store, credentials) -> None:
+        super().__init__(credentials)
+        self._hass = hass
+        self._store = store
+
+    def _persist(self, credentials) -> None:
+        # Called from executor threads.
+        self._hass.loop.call_soon_threadsafe(
+            self._store.async_delay_save, lambda: credentials
+        )
+
+
+class BlueairHistoryImporter:
+    """
+    Imports the measurement history of the legacy Blueair API as statistics.
+
+    A cursor per device records the end of the last imported hour, so every
+    run only downloads the samples that are not in the statistics yet.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, username: str, password: str
+    ) -> None:
+        """Initialize the importer."""
+        self.hass: HomeAssistant = hass
+        self._username: str = username
+        self._password: str = password
+        self._client: blueair.BlueAir | None = None
+        self._devices: list[dict[str, Any]] = []
+        self._disabled: bool = False
+        self._store = Store(hass, STORAGE_VERSION, f"{HISTORY_STORAGE_KEY}.{entry_id}")
+        self._credential_store = Store(
+            hass, STORAGE_VERSION, f"{LEGACY_CREDENTIALS_STORAGE_KEY}.{entry_id}"
+        )
+        self._cursors: dict[str, int] | None = None
+
+    def close(self) -> None:
+        """Close the connections of the legacy client."""
+        if self._client is not None:
+            self._client.close()
+
+    async def async_import(self, *_) -> None:
+        """Import the samples recorded since the last run."""
+        if self._disabled:
+            return
+
+        if self._client is None:
+            credential_cache = _StoreCredentialCache(
+                self.hass,
+                self._credential_store,
+                await self._credential_store.async_load(),
+            )
+            try:
+                self._client = await self.hass.async_add_executor_job(
+                    partial(
+                        blueair.BlueAir,
+                        self._username,
+                        self._password,
+                        credential_cache=credential_cache,
+                    )
+                )
+                devices = await self.hass.async_add_executor_job(self._client.get_devices)
+            except Exception as error:
+                # Accounts that only exist on the AWS API have no history.
+                LOGGER.debug(f"History backfill unavailable: {error}")
+                self._disabled = True
+                return
+            self._devices = devices
+
+        if self._cursors is None:
+            self._cursors = await self._store.async_load() or {}
+
+        for device in self._devices:
+            try:
+                await self._async_import_device(device["uuid"], device["name"])
+            except Exception as error:
+                LOGGER.warning(f"History backfill for {device['name']} failed: {error}")
+
+        self._store.async_delay_save(lambda: self._cursors)
+
+    async def _async_import_device(self, uuid: str, name: str) -> None:
+        now = round(time.time())
+        earliest = now - HISTORY_MAX_BACKFILL
+        start = max(self._cursors.get(uuid, 0), earliest - earliest % 3600)
+        # Only hours that are over, and whose last samples the server has
+        # published, can be imported.
+        published = now - blueair.blueair.SERVER_REFRESH_PERIOD
+        end = published - published % 3600
+        if end <= start:
+            return
+
+        samples = await self.hass.async_add_executor_job(
+            self._client.get_data_points_between, uuid, start, end
+        )
+
+        for measurement, unit in MEASUREMENT_UNITS.items():
+            if measurement not in samples.columns:
+                continue
+            statistics = [
+                {
+                    "start": dt_util.utc_from_timestamp(hour),
+                    "mean": mean,
+                    "min": minimum,
+                    "max": maximum,
+                }
+                for hour, mean, minimum, maximum in samples.aggregate(measurement, 3600)
+                if start <= hour < end
+            ]
+            if not statistics:
+                continue
+
+            async_add_external_statistics(
+                self.hass,
+                {
+                    "has_mean": True,
+                    "has_sum": False,
+                    "name": f"{name} {measurement}",
+                    "source": DOMAIN,
+                    "statistic_id": f"{DOMAIN}:{uuid.lower()}_{measurement}",
+                    "unit_of_measurement": unit,
+                },
+                statistics,
+            )
+
+        self._cursors[uuid] = end
+
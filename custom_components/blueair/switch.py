@@ -2,6 +2,7 @@ from custom_components.blueair.device import BlueairDataUpdateCoordinator
 from .const import DOMAIN
 from .device import BlueairDataUpdateCoordinator
 from .entity import BlueairEntity
+from .models import AUTO_MODE, CHILD_LOCK, NIGHT_MODE, POWER
 from homeassistant.components.switch import SwitchEntity
 
 
@@ -12,24 +13,18 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     ]["devices"]
     entities = []
     for device in devices:
-        # Don't add sensors to classic models
-        if (
-                device.model.startswith("classic") and not device.model.endswith("i")
-        ) or device.model == "foobot":
-            pass
-        else:
-            entities.extend(
-                [
-                    BlueAirChildLockSwitch(f"{device.device_name} Child Lock", device),
-                    BlueAirNightModeSwitch(f"{device.device_name} Night Mode", device),
-                    BlueAirAutoModeSwitch(f"{device.device_name} Auto Mode", device),
-                    BlueAirPowerSwitch(f"{device.device_name} Power", device),
-                ]
-            )
-            
+        if device.model_info.supports(CHILD_LOCK):
+            entities.append(BlueAirChildLockSwitch(f"{device.device_name} Child Lock", device))
+        if device.model_info.supports(NIGHT_MODE):
+            entities.append(BlueAirNightModeSwitch(f"{device.device_name} Night Mode", device))
+        if device.model_info.supports(AUTO_MODE):
+            entities.append(BlueAirAutoModeSwitch(f"{device.device_name} Auto Mode", device))
+        if device.model_info.supports(POWER):
+            entities.append(BlueAirPowerSwitch(f"{device.device_name} Power", device))
     async_add_entities(entities)
 
 class BlueAirChildLockSwitch(BlueairEntity, SwitchEntity):
+    _device_keys = ("childlock",)
     _attr_has_entity_name = True
 
     def __init__(self, name: str, device: BlueairDataUpdateCoordinator):
@@ -49,6 +44,7 @@ class BlueAirChildLockSwitch(BlueairEntity, SwitchEntity):
         await self._device.set_child_lock(False)
 
 class BlueAirNightModeSwitch(BlueairEntity, SwitchEntity):
+    _device_keys = ("nightmode",)
     _attr_has_entity_name = True
 
     def __init__(self, name: str, device: BlueairDataUpdateCoordinator):
@@ -68,6 +64,7 @@ class BlueAirNightModeSwitch(BlueairEntity, SwitchEntity):
         await self._device.set_night_mode(False)
 
 class BlueAirAutoModeSwitch(BlueairEntity, SwitchEntity):
+    _device_keys = ("automode",)
     _attr_has_entity_name = True
 
     def __init__(self, name: str, device: BlueairDataUpdateCoordinator):
@@ -87,6 +84,7 @@ class BlueAirAutoModeSwitch(BlueairEntity, SwitchEntity):
         await self._device.set_auto_mode(False)
 
 class BlueAirPowerSwitch(BlueairEntity, SwitchEntity):
+    _device_keys = ("standby",)
     _attr_has_entity_name = True
 
     def __init__(self, name: str, device: BlueairDataUpdateCoordinator):